@@ -0,0 +1,4 @@
+python3 src/bench_inline.py
+python3 src/bench_prose.py
+python3 src/bench_memory.py
+python3 src/benchmark.py "$@"
\ No newline at end of file
@@ -0,0 +1,99 @@
+import os
+import random
+
+WORDS = (
+    "the ring elves dwarves hobbits wizard mountain river forest shadow light ancient "
+    "road journey council fellowship tower king sword song star island sea west east "
+    "north south gate stone fire water white grey green golden silver long old quiet"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+# Settings for a synthetic site. Everything is derived from seed, so the same
+# settings always produce byte-for-byte the same corpus.
+class CorpusConfig:
+    def __init__(self, pages=200, blocks=40, link_density=0.3, list_ratio=0.15, code_ratio=0.1, depth=3, seed=1):
+        self.pages = pages
+        self.blocks = blocks
+        self.link_density = link_density
+        self.list_ratio = list_ratio
+        self.code_ratio = code_ratio
+        self.depth = depth
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+def _sentence(rng, config, urls):
+    words = []
+    for _ in range(rng.randint(8, 20)):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < config.link_density * 0.25 and urls:
+            word = f"[{word}]({rng.choice(urls)})"
+        elif roll < config.link_density * 0.3:
+            word = f"**{word}**"
+        elif roll < config.link_density * 0.35:
+            word = f"_{word}_"
+        elif roll < config.link_density * 0.4:
+            word = f"`{word}`"
+        words.append(word)
+    return " ".join(words).capitalize() + "."
+
+def generate_page(rng, config, title, urls):
+    blocks = [f"# {title}"]
+    for i in range(config.blocks):
+        roll = rng.random()
+        if roll < config.code_ratio:
+            lines = [f"    {rng.choice(WORDS)}({rng.choice(WORDS)})" for _ in range(rng.randint(2, 8))]
+            blocks.append("```\n" + "\n".join(lines) + "\n```")
+        elif roll < config.code_ratio + config.list_ratio:
+            items = [_sentence(rng, config, urls) for _ in range(rng.randint(2, 6))]
+            if rng.random() < 0.5:
+                blocks.append("\n".join(f"- {item}" for item in items))
+            else:
+                blocks.append("\n".join(f"{n}. {item}" for n, item in enumerate(items, 1)))
+        elif i % 10 == 9:
+            blocks.append(f"## {_sentence(rng, config, [])}")
+        elif roll > 0.97:
+            blocks.append(f"> {_sentence(rng, config, urls)}")
+        else:
+            blocks.append(" ".join(_sentence(rng, config, urls) for _ in range(rng.randint(2, 6))))
+    return "\n\n".join(blocks) + "\n"
+
+# Page URLs spread over directories up to config.depth levels deep. Each page's
+# own directory ends in its index, so every path is unique however many there are.
+def page_paths(config):
+    rng = random.Random(config.seed)
+    paths = [""]
+    for i in range(1, config.pages):
+        parts = [f"{rng.choice(WORDS)}-{rng.randint(0, 99)}" for _ in range(rng.randint(1, config.depth) - 1)]
+        parts.append(f"{rng.choice(WORDS)}-{i}")
+        paths.append("/".join(parts))
+    return paths
+
+# Writes content/ and template.html for the corpus under directory and returns the page count
+def generate_corpus(directory, config):
+    rng = random.Random(config.seed)
+    paths = page_paths(config)
+    urls = ["/" + path for path in paths] + ["https://example.com/" + word for word in WORDS[:5]]
+    content_dir = os.path.join(directory, "content")
+    for path in paths:
+        page_dir = os.path.join(content_dir, path)
+        os.makedirs(page_dir, exist_ok=True)
+        title = path.replace("/", " ").replace("-", " ").title() or "Home"
+        with open(os.path.join(page_dir, "index.md"), "w") as f:
+            f.write(generate_page(rng, config, title, urls))
+    with open(os.path.join(directory, "template.html"), "w") as f:
+        f.write(TEMPLATE)
+    return len(paths)
@@ -0,0 +1,40 @@
+import sys
+import timeit
+
+from textnode import TextNode, TextType
+from split_nodes import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+
+# The six-pass pipeline text_to_textnodes used before the single-pass scanner
+def split_chain(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    return nodes
+
+def link_heavy_paragraph(links):
+    parts = []
+    for i in range(links):
+        parts.append(f"see [page {i}](/docs/page-{i}) and **note {i}** with `code{i}`")
+    return " ".join(parts)
+
+def bench(func, text, repeat=5):
+    number = max(1, 2000 // max(1, len(text) // 100))
+    best = min(timeit.repeat(lambda: func(text), number=number, repeat=repeat))
+    return best / number
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000]
+    print(f"{'links':>6} {'chain (ms)':>12} {'scanner (ms)':>13} {'speedup':>8}")
+    for links in sizes:
+        text = link_heavy_paragraph(links)
+        assert text_to_textnodes(text) == split_chain(text)
+        chain = bench(split_chain, text)
+        scanner = bench(text_to_textnodes, text)
+        print(f"{links:>6} {chain * 1000:>12.3f} {scanner * 1000:>13.3f} {chain / scanner:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
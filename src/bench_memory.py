@@ -0,0 +1,97 @@
+import sys
+import tracemalloc
+
+from textnode import TextNode
+from htmlnode import LeafNode, ParentNode, HtmlStream, markdown_to_html_node, markdown_to_html_iter
+from split_nodes import text_to_textnodes
+
+# The node layout before __slots__: every instance carries its own __dict__
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+class DictLeafNode:
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+class DictParentNode:
+    def __init__(self, tag, children, props=None):
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
+
+def copy_tree(node, leaf_class, parent_class):
+    if node.children is None:
+        return leaf_class(node.tag, node.value, node.props)
+    return parent_class(node.tag, [copy_tree(child, leaf_class, parent_class) for child in node.children], node.props)
+
+def count_nodes(node):
+    if node.children is None:
+        return 1
+    return 1 + sum(count_nodes(child) for child in node.children)
+
+# Bytes still allocated after build() returns, i.e. the size of what it built
+def retained(build):
+    tracemalloc.start()
+    try:
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+# Most bytes allocated at once while run() executes
+def peak(run):
+    tracemalloc.start()
+    try:
+        run()
+        size = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return size
+
+# Swallows written HTML, so only what rendering holds on to is measured
+class NullWriter:
+    def write(self, text):
+        pass
+
+def document(nodes):
+    # Each paragraph has 10 inline spans (20 nodes with the <p> and leaves)
+    paragraph = "Some **bold** text, a [link](/docs/page) and `code` with _emphasis_ here and ![img](/a.png) end."
+    return "\n\n".join([paragraph] * max(1, nodes // 10))
+
+def main():
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tree = markdown_to_html_node(document(target))
+    node_count = count_nodes(tree)
+
+    # Copy the same tree into both layouts so only the node representation differs
+    _, slotted = retained(lambda: copy_tree(tree, LeafNode, ParentNode))
+    _, with_dict = retained(lambda: copy_tree(tree, DictLeafNode, DictParentNode))
+    print(f"HtmlNode tree with {node_count} nodes:")
+    print(f"  __dict__ nodes: {with_dict / 1e6:8.2f} MB ({with_dict / node_count:6.1f} B/node)")
+    print(f"  __slots__ nodes: {slotted / 1e6:7.2f} MB ({slotted / node_count:6.1f} B/node)")
+    print(f"  saved: {(with_dict - slotted) / node_count:.1f} B/node ({1 - slotted / with_dict:.0%})")
+
+    spans = text_to_textnodes(document(target).replace("\n\n", " "))
+    _, slotted = retained(lambda: [TextNode(node.text, node.text_type, node.url) for node in spans])
+    _, with_dict = retained(lambda: [DictTextNode(node.text, node.text_type, node.url) for node in spans])
+    print(f"{len(spans)} TextNodes:")
+    print(f"  __dict__: {with_dict / len(spans):6.1f} B/node, __slots__: {slotted / len(spans):6.1f} B/node")
+
+    # Writing a page from the whole tree versus streaming it block by block
+    markdown = document(target)
+    tree_peak = peak(lambda: markdown_to_html_node(markdown).write_html(NullWriter()))
+    stream_peak = peak(lambda: HtmlStream(markdown_to_html_iter(markdown)).write_html(NullWriter()))
+    print(f"Writing a {len(markdown) / 1e6:.1f} MB document (source excluded):")
+    print(f"  node tree peak: {tree_peak / 1e6:8.2f} MB")
+    print(f"  streamed peak:  {stream_peak / 1e6:8.2f} MB")
+
+if __name__ == "__main__":
+    main()
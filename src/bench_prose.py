@@ -0,0 +1,40 @@
+import sys
+import random
+import timeit
+
+from bench_corpus import WORDS
+from htmlnode import text_to_children, text_node_to_html_node
+from split_nodes import scan_textnodes
+
+# text_to_children without the plain-text fast path: every paragraph goes through the scanner
+def scanned_children(text):
+    return [text_node_to_html_node(node) for node in scan_textnodes(text)]
+
+# Paragraphs of prose where only markup_ratio of them contain any inline markup
+def prose_paragraphs(count, markup_ratio, seed=1):
+    rng = random.Random(seed)
+    paragraphs = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(40, 120))]
+        if rng.random() < markup_ratio:
+            words[rng.randrange(len(words))] = f"**{rng.choice(WORDS)}**"
+            words[rng.randrange(len(words))] = f"[{rng.choice(WORDS)}](/{rng.choice(WORDS)})"
+        paragraphs.append(" ".join(words).capitalize() + ".")
+    return paragraphs
+
+def bench(func, paragraphs, repeat=5):
+    return min(timeit.repeat(lambda: [func(text) for text in paragraphs], number=1, repeat=repeat))
+
+def main():
+    ratios = [float(arg) for arg in sys.argv[1:]] or [0.0, 0.1, 0.5, 1.0]
+    print(f"{'markup':>7} {'scanner (ms)':>13} {'fast path (ms)':>15} {'speedup':>8}")
+    for ratio in ratios:
+        paragraphs = prose_paragraphs(2000, ratio)
+        assert [[node.to_html() for node in text_to_children(text)] for text in paragraphs] == \
+            [[node.to_html() for node in scanned_children(text)] for text in paragraphs]
+        scanner = bench(scanned_children, paragraphs)
+        fast = bench(text_to_children, paragraphs)
+        print(f"{ratio:>7.0%} {scanner * 1000:>13.2f} {fast * 1000:>15.2f} {scanner / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
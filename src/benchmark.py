@@ -0,0 +1,131 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+from contextlib import redirect_stdout
+
+from bench_corpus import CorpusConfig, generate_corpus
+from markdown_utils import markdown_to_blocks
+from htmlnode import text_to_children, markdown_to_html_node
+from generate_pages import find_pages, generate_pages_recursive
+
+# Best wall time of repeat runs of func, plus the peak traced memory of one extra run
+def measure(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(config, repeat=3, jobs=1):
+    work_dir = tempfile.mkdtemp(prefix="ssg-bench-")
+    try:
+        page_count = generate_corpus(work_dir, config)
+        content_dir = os.path.join(work_dir, "content")
+        template_path = os.path.join(work_dir, "template.html")
+        public_dir = os.path.join(work_dir, "public")
+
+        sources = []
+        for page in find_pages(content_dir, public_dir, template_path):
+            with open(page.source) as f:
+                sources.append(f.read())
+        total_bytes = sum(len(source.encode()) for source in sources)
+        blocks = [block for source in sources for block in markdown_to_blocks(source)]
+        nodes = [markdown_to_html_node(source) for source in sources]
+
+        def build():
+            with redirect_stdout(io.StringIO()):
+                generate_pages_recursive(content_dir, template_path, public_dir, jobs=jobs)
+
+        stages = {
+            "markdown_to_blocks": lambda: [markdown_to_blocks(source) for source in sources],
+            "text_to_children": lambda: [text_to_children(block) for block in blocks if not block.startswith("```")],
+            "markdown_to_html_node": lambda: [markdown_to_html_node(source) for source in sources],
+            "to_html": lambda: [node.to_html() for node in nodes],
+            "generate_pages_recursive": build,
+        }
+        results = {}
+        for name, func in stages.items():
+            seconds, peak = measure(func, repeat)
+            results[name] = {
+                "seconds": seconds,
+                "pages_per_second": page_count / seconds,
+                "mb_per_second": total_bytes / 1e6 / seconds,
+                "peak_memory_mb": peak / 1e6,
+            }
+    finally:
+        shutil.rmtree(work_dir)
+
+    return {
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "corpus": dict(config.to_dict(), bytes=total_bytes),
+        "jobs": jobs,
+        "repeat": repeat,
+        "stages": results,
+    }
+
+def report(result):
+    corpus = result["corpus"]
+    print(f"Revision {result['revision']}, {corpus['pages']} pages, {corpus['bytes'] / 1e6:.2f} MB of markdown (best of {result['repeat']})")
+    print(f"{'stage':<26} {'time (ms)':>10} {'pages/s':>10} {'MB/s':>8} {'peak MB':>8}")
+    for name, stage in result["stages"].items():
+        print(f"{name:<26} {stage['seconds'] * 1000:>10.1f} {stage['pages_per_second']:>10.0f} "
+              f"{stage['mb_per_second']:>8.2f} {stage['peak_memory_mb']:>8.1f}")
+
+# Prints how each stage's time changed relative to an earlier result file
+def compare(result, baseline):
+    print(f"Compared with {baseline.get('revision')}:")
+    for name, stage in result["stages"].items():
+        old = baseline["stages"].get(name)
+        if old:
+            print(f"  {name:<26} {old['seconds'] / stage['seconds']:>6.2f}x")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the generator on a synthetic site")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=40, help="blocks per page")
+    parser.add_argument("--links", type=float, default=0.3, help="link and markup density, 0 to 1")
+    parser.add_argument("--lists", type=float, default=0.15, help="share of blocks that are lists")
+    parser.add_argument("--code", type=float, default=0.1, help="share of blocks that are code")
+    parser.add_argument("--depth", type=int, default=3, help="maximum directory nesting")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="compare against an earlier --json result")
+    args = parser.parse_args(argv)
+    if args.depth < 1:
+        parser.error("--depth must be at least 1")
+
+    config = CorpusConfig(args.pages, args.blocks, args.links, args.lists, args.code, args.depth, args.seed)
+    result = run(config, args.repeat, args.jobs)
+    report(result)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(result, json.load(f))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=1)
+
+if __name__ == "__main__":
+    main()
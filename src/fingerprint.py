@@ -0,0 +1,59 @@
+import os
+import json
+import hashlib
+
+from manifest import hash_file_cached, remove_output, write_atomic
+from static_files import scan_files, place_file, same_stat
+from images import derivative_key, derivatives
+
+ASSET_MANIFEST = "asset-manifest.json"
+HASH_LENGTH = 10
+
+# "css/index.css" with contents hashing to 3f2a... is published as "css/index.3f2a1b9c0d.css"
+def fingerprint_path(rel_path, digest):
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+# Maps the site URL of every file in static_dir to its fingerprinted URL. Hashes are
+# reused from state (the state returned last time) while a file's mtime and size are
+# unchanged, so only new or edited files are read. With images (an image_table), the
+# resized versions are mapped too, by the hash of their derivative_key: it changes
+# whenever their contents do, and is known before (or without) resizing anything.
+# Returns (assets, state).
+def fingerprint_assets(static_dir, state=None, images=None):
+    old_files = (state or {}).get("files", {})
+    new_files = {}
+    assets = {}
+    digests = {}
+    for rel_path in sorted(scan_files(static_dir)):
+        digest = hash_file_cached(os.path.join(static_dir, rel_path), old_files, new_files)
+        digests["/" + rel_path] = digest
+        assets["/" + rel_path] = "/" + fingerprint_path(rel_path, digest)
+    for url, derivative_url, width in derivatives(images or {}):
+        digest = hashlib.sha256(derivative_key(digests[url], width).encode()).hexdigest()
+        assets[derivative_url] = "/" + fingerprint_path(derivative_url[1:], digest)
+    return assets, {"files": new_files, "assets": assets}
+
+# Places a fingerprinted copy (or link) of every asset in public_dir next to the
+# original, removes the copies of assets from previous that changed or went away,
+# and writes the URL mapping to public_dir/asset-manifest.json. Assets that are not
+# in static_dir, the resized images, are copied from public_dir.
+def publish_assets(static_dir, public_dir, assets, previous=None, link=False):
+    placed = 0
+    for url, fingerprinted in assets.items():
+        src = os.path.join(static_dir, url[1:])
+        if not os.path.exists(src):
+            src = os.path.join(public_dir, url[1:])
+        dst = os.path.join(public_dir, fingerprinted[1:])
+        if os.path.exists(dst) and same_stat(os.stat(src), os.stat(dst)):
+            continue
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        place_file(src, dst, link)
+        placed += 1
+    current = set(assets.values())
+    stale = [url for url in (previous or {}).values() if url not in current]
+    for url in stale:
+        remove_output(os.path.join(public_dir, url[1:]), public_dir)
+
+    write_atomic(os.path.join(public_dir, ASSET_MANIFEST), json.dumps(assets, indent=1, sort_keys=True))
+    print(f"Fingerprinted {len(assets)} assets: {placed} placed, {len(stale)} removed")
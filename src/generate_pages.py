@@ -1,31 +1,375 @@
 import os
-from markdown_utils import extract_title
-from htmlnode import markdown_to_html_node
+import html
+import datetime
+from collections import namedtuple
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from markdown_utils import extract_title, iter_blocks, BlockType
+from htmlnode import markdown_to_html_node, markdown_to_html_iter, block_to_html_node, html_chunks, ParentNode, HtmlStream
+from split_nodes import text_to_textnodes
+from manifest import hash_file_cached, load_manifest, save_manifest, remove_output
+from template import load_template, find_template
+from urls import site_resolver
+from profiler import timed, stage
+from render_cache import RenderCache
+from parse_cache import ParseCache, document_to_html_nodes
+from mapped_markdown import MappedMarkdown, open_markdown
+from links import recording_resolver, site_links
+from search_index import TermCounter
+from images import table_digest
 
-def generate_pages_recursive(content_dir="./content", template_path="./template.html", public_dir="./public", base_path="/"):
-    # Walk through all directories under content_dir
+DESCRIPTION_LENGTH = 160
+
+# source: markdown path, output: html path, template: template path, url: site-relative URL
+Page = namedtuple("Page", ["source", "output", "template", "url"])
+
+# Collects a Page for every index.md under content_dir
+def find_pages(content_dir, public_dir, template_path="./template.html"):
+    pages = []
     for root, dirs, files in os.walk(content_dir):
+        # Sort so the build order (and the log) is the same on every machine
+        dirs.sort()
         # Check if index.md exists in current directory
         if "index.md" in files:
             # Get relative path from content dir
             rel_path = os.path.relpath(root, content_dir)
-            
-            # Create corresponding output directory in public
-            output_dir = os.path.join(public_dir, rel_path)
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Generate HTML for this index.md
             markdown_path = os.path.join(root, "index.md")
-            html_output_path = os.path.join(output_dir, "index.html")
-            
-            # Use existing generate_page logic
-            print(f"Generating page from {markdown_path} to {html_output_path} using template {template_path}")
-            markdown = open(markdown_path, "r").read()
-            template = open(template_path, "r").read()
-            title = extract_title(markdown)
-            html = markdown_to_html_node(markdown).to_html()
-            html = template.replace("{{ Title }}", title).replace("{{ Content }}", html)
-            html = html.replace('href="/', f'href="{base_path}')
-            html = html.replace('src="/', f'src="{base_path}')
-            open(html_output_path, "w").write(html)
-    
\ No newline at end of file
+            html_output_path = os.path.join(public_dir, rel_path, "index.html")
+            url = "/" if rel_path == "." else "/" + rel_path.replace(os.sep, "/") + "/"
+            pages.append(Page(markdown_path, html_output_path, find_template(root, content_dir, template_path), url))
+    return pages
+
+# Plain text of the first paragraph, shortened for <meta name="description">
+def page_description(markdown):
+    for block, block_type in iter_blocks(markdown):
+        if block_type == BlockType.PARAGRAPH:
+            text = " ".join("".join(node.text for node in text_to_textnodes(block)).split())
+            if len(text) > DESCRIPTION_LENGTH:
+                text = text[:DESCRIPTION_LENGTH - 3].rsplit(" ", 1)[0] + "..."
+            return html.escape(text)
+    return ""
+
+# What a render records about a page for the site-wide indexes: its title, the site
+# URLs it links to and the counts of its search terms
+PAGE_INFO_FIELDS = ("title", "links", "terms")
+
+def page_info(values, urls, terms):
+    return {"title": values["Title"], "links": site_links(urls), "terms": terms.terms}
+
+# The template variables for a page
+def page_values(page, markdown, template, resolve_url, content):
+    values = {
+        "Title": extract_title(markdown),
+        "Content": content,
+        "Path": resolve_url(page.url),
+    }
+    # Only compute the extra variables a template actually uses
+    if "Date" in template.slots:
+        values["Date"] = datetime.date.fromtimestamp(os.path.getmtime(page.source)).isoformat()
+    if "Description" in template.slots:
+        values["Description"] = page_description(markdown)
+    return values
+
+# The page's {{ Content }}: streamed block by block while the template is written, so
+# no page ever holds its whole node tree, unless the template uses it more than once.
+# With a parse_cache, blocks come from the page's cached parse instead of the parser,
+# except for memory-mapped sources: a whole parsed document of those would not fit
+# the bounded memory they are streamed in.
+def page_content(markdown, template, resolve_url, cache, on_text, images, parse_cache=None):
+    if parse_cache is not None and isinstance(markdown, str):
+        nodes = parse_cache.render(markdown, resolve_url, on_text, images)
+        if "Content" in template.repeated:
+            return ParentNode("div", list(nodes))
+        return HtmlStream(html_chunks(nodes))
+    if "Content" in template.repeated:
+        return markdown_to_html_node(markdown, resolve_url, cache, on_text, images)
+    return HtmlStream(markdown_to_html_iter(markdown, resolve_url, cache, on_text, images))
+
+def generate_page(page, base_path="/", timings=None, cache=None, images=None, assets=None, parse_cache=None):
+    print(f"Generating page from {page.source} to {page.output} using template {page.template}")
+    return render_page(page, base_path, timings, cache, images, assets, parse_cache)
+
+# Parses, renders and writes a single page; it touches no shared state (other than
+# the optional RenderCache) so it can run in any process. When a timings dict is
+# passed, the seconds spent in each stage and the output size are added to it.
+# images is the optional image_table for width, height and srcset on images, and
+# assets the optional fingerprinted URL of each static file. parse_cache, if given, is
+# a ParseCache that replaces the parser (and the render cache). Returns the page's PageInfo.
+def render_page(page, base_path="/", timings=None, cache=None, images=None, assets=None, parse_cache=None):
+    with timed(timings, "read"):
+        source = open_markdown(page.source)
+        resolve_url = site_resolver(base_path, assets)
+        template = load_template(page.template, resolve_url)
+
+    # markdown is a string, or a MappedMarkdown for very large sources, which is
+    # decoded one line at a time as the block scanner asks for it
+    urls = []
+    terms = TermCounter()
+    with source as markdown:
+        if timings is None:
+            content = page_content(markdown, template, recording_resolver(resolve_url, urls), cache, terms, images, parse_cache)
+        elif parse_cache is not None and isinstance(markdown, str):
+            with timed(timings, "blocks"):
+                document = parse_cache.parse(markdown)
+            with timed(timings, "inline"):
+                content = ParentNode("div", list(document_to_html_nodes(document, recording_resolver(resolve_url, urls), terms, images)))
+        else:
+            # Same result as markdown_to_html_node, split so block scanning and inline parsing are timed apart
+            with timed(timings, "blocks"):
+                blocks = list(iter_blocks(markdown))
+            with timed(timings, "inline"):
+                render_block = cache.render if cache is not None else block_to_html_node
+                block_resolve_url = recording_resolver(resolve_url, urls)
+                content = ParentNode("div", [render_block(block, block_type, block_resolve_url, terms, images) for block, block_type in blocks])
+
+        values = page_values(page, markdown, template, resolve_url, content)
+
+        # Create corresponding output directory in public
+        os.makedirs(os.path.dirname(page.output), exist_ok=True)
+        if timings is None:
+            # Blocks are parsed while the page is written, so a parse error would leave
+            # half a page behind; write next to it and only replace it once complete
+            tmp_path = page.output + ".tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    template.write(f, values)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            os.replace(tmp_path, page.output)
+            return page_info(values, urls, terms)
+
+    # Profiling serializes to strings first so each stage gets its own number
+    with timed(timings, "to_html"):
+        values["Content"] = content.to_html()
+    with timed(timings, "template"):
+        html = template.render(values)
+    with timed(timings, "write"):
+        with open(page.output, "w") as f:
+            f.write(html)
+    timings["size"] = len(html.encode())
+    return page_info(values, urls, terms)
+
+# Each worker process keeps its own render cache for the whole build, sending the
+# blocks it adds back with each page for the parent's cache, and gets the image and
+# asset tables once instead of with every page. Parse cache workers
+# share the cache directory, each writing the documents it parses.
+_worker_cache = None
+_worker_images = None
+_worker_assets = None
+_worker_parse_cache = None
+
+def _init_worker(cache_settings, images=None, assets=None, parse_cache_settings=None):
+    global _worker_cache, _worker_images, _worker_assets, _worker_parse_cache
+    _worker_cache = RenderCache(*cache_settings) if cache_settings else None
+    if _worker_cache is not None:
+        _worker_cache.added = []
+    _worker_images = images
+    _worker_assets = assets
+    _worker_parse_cache = ParseCache(*parse_cache_settings) if parse_cache_settings else None
+
+# (hits, misses) of each cache a worker has, to report what one page added
+def _cache_counts(*caches):
+    return [(cache.hits, cache.misses) if cache is not None else (0, 0) for cache in caches]
+
+def _render_page_job(job):
+    page, base_path, profile = job
+    timings = {} if profile else None
+    before = _cache_counts(_worker_cache, _worker_parse_cache)
+    info = render_page(page, base_path, timings, _worker_cache, _worker_images, _worker_assets, _worker_parse_cache)
+    after = _cache_counts(_worker_cache, _worker_parse_cache)
+    added = []
+    if _worker_cache is not None:
+        added, _worker_cache.added = _worker_cache.added, []
+    counts = [(hits - old_hits, misses - old_misses) for (hits, misses), (old_hits, old_misses) in zip(after, before)]
+    return page, timings, info, counts, added
+
+def _write_text(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+# Overlaps I/O with rendering: reader threads prefetch sources and writer threads
+# flush outputs while the main thread renders. At most depth reads and depth
+# writes are in flight, which caps memory on huge sites. Pages are still
+# rendered and logged in order. Sources large enough to be memory-mapped are
+# rendered by render_page on the main thread instead, streaming straight to disk.
+# Returns each page's PageInfo like generate_pages.
+def generate_pages_pipelined(pages, base_path="/", readers=4, writers=4, depth=32, cache=None, images=None, assets=None, parse_cache=None):
+    resolve_url = site_resolver(base_path, assets)
+    reads = deque()
+    writes = deque()
+    remaining = iter(pages)
+    infos = {}
+
+    def finish_write():
+        page, future = writes.popleft()
+        future.result()
+        print(f"Generated page from {page.source} to {page.output} using template {page.template}")
+
+    with ThreadPoolExecutor(readers) as read_pool, ThreadPoolExecutor(writers) as write_pool:
+        for page in islice(remaining, depth):
+            reads.append((page, read_pool.submit(open_markdown, page.source)))
+        while reads:
+            page, future = reads.popleft()
+            source = future.result()
+            for next_page in islice(remaining, 1):
+                reads.append((next_page, read_pool.submit(open_markdown, next_page.source)))
+
+            if isinstance(source, MappedMarkdown):
+                source.close()
+                # Keep the log in page order
+                while writes:
+                    finish_write()
+                infos[page.source] = render_page(page, base_path, cache=cache, images=images, assets=assets, parse_cache=parse_cache)
+                print(f"Generated page from {page.source} to {page.output} using template {page.template}")
+                continue
+
+            template = load_template(page.template, resolve_url)
+            urls = []
+            terms = TermCounter()
+            with source as markdown:
+                content = page_content(markdown, template, recording_resolver(resolve_url, urls), cache, terms, images, parse_cache)
+                values = page_values(page, markdown, template, resolve_url, content)
+                html = template.render(values)
+            infos[page.source] = page_info(values, urls, terms)
+            writes.append((page, write_pool.submit(_write_text, page.output, html)))
+            if len(writes) >= depth:
+                finish_write()
+        while writes:
+            finish_write()
+    return infos
+
+# Renders pages in order, or spread over a process pool when jobs > 1. Returns
+# the PageInfo of each page, keyed by its source path.
+def generate_pages(pages, base_path="/", jobs=1, profiler=None, cache=None, pipeline=False, images=None, assets=None, parse_cache=None):
+    if pipeline:
+        return generate_pages_pipelined(pages, base_path, cache=cache, images=images, assets=assets, parse_cache=parse_cache)
+    infos = {}
+    if jobs <= 1 or len(pages) <= 1:
+        for page in pages:
+            timings = {} if profiler else None
+            infos[page.source] = generate_page(page, base_path, timings, cache, images, assets, parse_cache)
+            if profiler:
+                profiler.record_page(page.source, timings)
+        return infos
+
+    jobs = min(jobs, len(pages))
+    # A few chunks per worker keeps the pool busy without paying IPC per page
+    chunksize = max(1, len(pages) // (jobs * 4))
+    work = [(page, base_path, profiler is not None) for page in pages]
+    # Workers start from the cache's saved entries and send back what they add
+    cache_settings = cache.settings if cache is not None else None
+    parse_cache_settings = parse_cache.settings if parse_cache is not None else None
+    initargs = (cache_settings, images, assets, parse_cache_settings)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as executor:
+        # map() yields in submission order, so the log is the same as a serial build
+        for page, timings, info, counts, added in executor.map(_render_page_job, work, chunksize=chunksize):
+            print(f"Generated page from {page.source} to {page.output} using template {page.template}")
+            infos[page.source] = info
+            if profiler:
+                profiler.record_page(page.source, timings)
+            for target, (hits, misses) in zip((cache, parse_cache), counts):
+                if target is not None:
+                    target.hits += hits
+                    target.misses += misses
+            for key, entry in added:
+                cache.put(key, entry)
+    return infos
+
+# Builds every page and returns the site's pages for LinkIndex and SearchIndex:
+# each page's source path mapped to its URL and PageInfo
+def generate_pages_recursive(content_dir="./content", template_path="./template.html", public_dir="./public", base_path="/", manifest_path=None, jobs=1, profiler=None, cache=None, pipeline=False, images=None, assets=None, parse_cache=None):
+    with stage(profiler, "discover"):
+        pages = find_pages(content_dir, public_dir, template_path)
+    if manifest_path is None:
+        with stage(profiler, "render"):
+            infos = generate_pages(pages, base_path, jobs, profiler, cache, pipeline, images, assets, parse_cache)
+        return {page.source: dict(infos[page.source], url=page.url) for page in pages}
+
+    with stage(profiler, "manifest"):
+        manifest = load_manifest(manifest_path)
+    manifest = generate_pages_incremental(pages, manifest, public_dir, base_path, jobs, profiler, cache, pipeline, images, assets, parse_cache)
+    with stage(profiler, "manifest"):
+        save_manifest(manifest_path, manifest)
+    return site_pages(manifest)
+
+# The site's pages as recorded in manifest, in the form generate_pages_recursive returns
+def site_pages(manifest):
+    return {
+        source: {"url": entry["url"], **{field: entry[field] for field in PAGE_INFO_FIELDS}}
+        for source, entry in manifest.get("pages", {}).items()
+    }
+
+# Every file a page's output depends on: its markdown, its template and the template's includes
+def page_dependencies(page):
+    return [page.source, page.template] + load_template(page.template).dependencies
+
+# Renders only pages whose source, template, includes or settings changed since the
+# build recorded in manifest, removes outputs of deleted pages, and returns the new
+# manifest. The manifest keeps each page's dependencies with their hashes, so a
+# changed template or partial only re-renders the pages that used it, and the
+# PageInfo of each page, so unchanged pages are not parsed again for the site indexes.
+def generate_pages_incremental(pages, manifest, public_dir, base_path="/", jobs=1, profiler=None, cache=None, pipeline=False, images=None, assets=None, parse_cache=None):
+    # Any change to the image or asset table re-renders every page; static files change rarely
+    images_digest = table_digest(images) if images is not None else None
+    assets_digest = table_digest(assets) if assets is not None else None
+    settings_changed = (
+        manifest.get("base_path") != base_path
+        or manifest.get("public_dir") != public_dir
+        or manifest.get("images") != images_digest
+        or manifest.get("assets") != assets_digest
+    )
+    old_files = manifest.get("files", {})
+    new_files = {}
+    old_pages = manifest.get("pages", {})
+    new_pages = {}
+    hashes = {}
+    dirty = []
+
+    def current_hash(path):
+        if path not in hashes:
+            hashes[path] = hash_file_cached(path, old_files, new_files)
+        return hashes[path]
+
+    with stage(profiler, "hash"):
+        for page in pages:
+            deps = {path: current_hash(path) for path in page_dependencies(page)}
+            entry = old_pages.get(page.source)
+            up_to_date = (
+                not settings_changed
+                and entry is not None
+                and entry["deps"] == deps
+                and entry["output"] == page.output
+                and os.path.exists(page.output)
+            )
+            if not up_to_date:
+                dirty.append(page)
+            new_pages[page.source] = {"output": page.output, "url": page.url, "deps": deps}
+            if up_to_date:
+                new_pages[page.source].update((field, entry[field]) for field in PAGE_INFO_FIELDS)
+
+    with stage(profiler, "render"):
+        # Only re-rendered pages are indexed again; the rest keep what was recorded
+        for source, info in generate_pages(dirty, base_path, jobs, profiler, cache, pipeline, images, assets, parse_cache).items():
+            new_pages[source].update(info)
+
+    # Delete outputs whose sources are gone
+    outputs = {entry["output"] for entry in new_pages.values()}
+    removed = 0
+    for markdown_path, entry in old_pages.items():
+        if markdown_path not in new_pages and entry["output"] not in outputs:
+            print(f"Removing {entry['output']} (source {markdown_path} was deleted)")
+            remove_output(entry["output"], public_dir)
+            removed += 1
+
+    print(f"Incremental build: {len(dirty)} rendered, {len(pages) - len(dirty)} unchanged, {removed} removed")
+    return {
+        "files": new_files,
+        "base_path": base_path,
+        "public_dir": public_dir,
+        "images": images_digest,
+        "assets": assets_digest,
+        "pages": new_pages,
+    }
@@ -1,8 +1,16 @@
+import io
 from textnode import TextNode, TextType
-from markdown_utils import markdown_to_blocks, block_to_block_type, BlockType
-from split_nodes import split_nodes_image, split_nodes_link, split_nodes_delimiter
+from markdown_utils import iter_blocks, BlockType
+from split_nodes import scan_textnodes, INLINE_MARKUP
+from images import image_props
+
+# Interned heading tags so every heading shares one string per level
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
 
 class HtmlNode:
+    # Nodes are created per inline span, so keep them free of a per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag = None, value = None, children = None, props = None):
         self.tag = tag
         self.value = value
@@ -11,6 +19,10 @@ class HtmlNode:
 
     def to_html(self):
         raise NotImplementedError("Subclasses must implement this method")
+
+    # Writes the node's HTML to any object with a write() method, e.g. an open file
+    def write_html(self, fp):
+        fp.write(self.to_html())
     
     def props_to_html(self):
         if not self.props:
@@ -25,6 +37,8 @@ class HtmlNode:
     
 
 class LeafNode(HtmlNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props = None):
         if value is None:
             raise ValueError("LeafNode value cannot be None")
@@ -38,6 +52,8 @@ class LeafNode(HtmlNode):
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
 class ParentNode(HtmlNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list, props = None):
         if tag is None:
             raise ValueError("ParentNode tag cannot be None")
@@ -46,19 +62,26 @@ class ParentNode(HtmlNode):
         super().__init__(tag, None, children, props)
 
     def to_html(self):
+        # Serialize the whole tree into one shared buffer instead of joining strings per level
+        buffer = io.StringIO()
+        self.write_html(buffer)
+        return buffer.getvalue()
+
+    def write_html(self, fp):
         if self.tag is None:
             raise ValueError("ParentNode tag cannot be None")
         if self.children is None:
             raise ValueError("ParentNode children cannot be None")
-        
-        children_html = []
+
+        fp.write(f"<{self.tag}{self.props_to_html()}>")
         for child in self.children:
-            children_html.append(child.to_html())
-        
-        return f"<{self.tag}{self.props_to_html()}>{''.join(children_html)}</{self.tag}>"
+            child.write_html(fp)
+        fp.write(f"</{self.tag}>")
     
 
-def text_node_to_html_node(text_node):
+# resolve_url, if given, maps every link and image URL as it is emitted (e.g. to add a base path).
+# images, if given, is an image_table whose entries add width, height and srcset to images.
+def text_node_to_html_node(text_node, resolve_url=None, images=None):
     if text_node.text_type == TextType.TEXT:
         return LeafNode(None, text_node.text)
     elif text_node.text_type == TextType.BOLD:
@@ -68,65 +91,107 @@ def text_node_to_html_node(text_node):
     elif text_node.text_type == TextType.CODE:
         return LeafNode("code", text_node.text)
     elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        url = resolve_url(text_node.url) if resolve_url else text_node.url
+        return LeafNode("a", text_node.text, {"href": url})
     elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        url = resolve_url(text_node.url) if resolve_url else text_node.url
+        props = {"src": url, "alt": text_node.text}
+        image = images.get(text_node.url) if images else None
+        if image is not None:
+            props.update(image_props(image, resolve_url))
+        return LeafNode("img", "", props)
     else:
         raise ValueError("Invalid text node type")
 
-def text_to_children(text):
-    # Convert text to text nodes
-    nodes = [TextNode(text, TextType.TEXT)]
-    
-    # Split by images first
-    nodes = split_nodes_image(nodes)
-    
-    # Split by links
-    nodes = split_nodes_link(nodes)
-    
-    # Split by bold
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    
-    # Split by italic (both * and _)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    
-    # Split by code
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    
-    # Convert text nodes to HTML nodes
-    return [text_node_to_html_node(node) for node in nodes]
+# on_text, if given, is called with the text of every inline node (e.g. to index it for search)
+def text_to_children(text, resolve_url=None, on_text=None, images=None):
+    # Text without markup is a single leaf; skip building the TextNode for it
+    if not INLINE_MARKUP.search(text):
+        if on_text and text:
+            on_text(text)
+        return [LeafNode(None, text)] if text else []
+    # Convert text to text nodes, then text nodes to HTML nodes
+    nodes = scan_textnodes(text)
+    if on_text:
+        for node in nodes:
+            on_text(node.text)
+    return [text_node_to_html_node(node, resolve_url, images) for node in nodes]
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = []
-    
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        if block_type == BlockType.PARAGRAPH:
-            children.append(ParentNode("p", text_to_children(block)))
-        elif block_type == BlockType.HEADING:
-            level = len(block.split(" ")[0])  # Count number of # symbols
-            children.append(ParentNode(f"h{level}", text_to_children(block[level+1:])))
-        elif block_type == BlockType.CODE:
-            code_node = text_node_to_html_node(TextNode(block[3:-3].strip(), TextType.CODE))
-            children.append(ParentNode("pre", [code_node]))
-        elif block_type == BlockType.QUOTE:
-            quote_text = block[2:].strip()  # Remove "> " prefix
-            children.append(ParentNode("blockquote", text_to_children(quote_text)))
-        elif block_type == BlockType.UNORDERED_LIST:
-            # Split the block into individual list items
-            items = [item.strip()[2:].strip() for item in block.split("\n") if item.strip()]
-            list_items = []
-            for item in items:
-                list_items.append(ParentNode("li", text_to_children(item)))
-            children.append(ParentNode("ul", list_items))
-        elif block_type == BlockType.ORDERED_LIST:
-            # Split the block into individual list items
-            items = [item.strip()[item.find(".")+1:].strip() for item in block.split("\n") if item.strip()]
-            list_items = []
-            for item in items:
-                list_items.append(ParentNode("li", text_to_children(item)))
-            children.append(ParentNode("ol", list_items))
-            
+# Splits one block from iter_blocks into its tag and the inline text inside it: a
+# single string for most blocks, one per item for lists (each item becomes an <li>).
+# A code block's one string is its code, which is not parsed for inline markup.
+def block_parts(block, block_type):
+    if block_type == BlockType.PARAGRAPH:
+        return "p", [block]
+    elif block_type == BlockType.HEADING:
+        level = len(block.split(" ")[0])  # Count number of # symbols
+        tag = HEADING_TAGS[level - 1] if level <= len(HEADING_TAGS) else f"h{level}"
+        return tag, [block[level+1:]]
+    elif block_type == BlockType.CODE:
+        return "pre", [block[3:-3].strip()]
+    elif block_type == BlockType.QUOTE:
+        return "blockquote", [block[2:].strip()]  # Remove "> " prefix
+    elif block_type == BlockType.UNORDERED_LIST:
+        # Split the block into individual list items
+        return "ul", [item.strip()[2:].strip() for item in block.split("\n") if item.strip()]
+    elif block_type == BlockType.ORDERED_LIST:
+        # Split the block into individual list items
+        return "ol", [item.strip()[item.find(".")+1:].strip() for item in block.split("\n") if item.strip()]
+    raise ValueError(f"Invalid block type: {block_type}")
+
+# Converts one block from iter_blocks to its HTML node
+def block_to_html_node(block, block_type, resolve_url=None, on_text=None, images=None):
+    tag, parts = block_parts(block, block_type)
+    if tag == "pre":
+        return ParentNode("pre", [text_node_to_html_node(TextNode(parts[0], TextType.CODE))])
+    if tag == "ul" or tag == "ol":
+        return ParentNode(tag, [ParentNode("li", text_to_children(item, resolve_url, on_text, images)) for item in parts])
+    return ParentNode(tag, text_to_children(parts[0], resolve_url, on_text, images))
+
+# markdown is a string or an iterable of lines (e.g. an open file).
+# cache, if given, is a RenderCache used to reuse the HTML of repeated blocks.
+# on_text, if given, sees the text of headings, paragraphs, quotes and list items.
+# images is passed on to text_node_to_html_node.
+def markdown_to_html_node(markdown, resolve_url=None, cache=None, on_text=None, images=None):
+    if cache is not None:
+        children = [cache.render(block, block_type, resolve_url, on_text, images) for block, block_type in iter_blocks(markdown)]
+    else:
+        children = [block_to_html_node(block, block_type, resolve_url, on_text, images) for block, block_type in iter_blocks(markdown)]
     return ParentNode("div", children)
+
+# Same HTML as markdown_to_html_node(...).to_html(), yielded one block at a time: each
+# block is parsed and serialized only when the next chunk is asked for, so no more than
+# one block's nodes exist at once. resolve_url and on_text are called as blocks are
+# reached, not up front.
+def markdown_to_html_iter(markdown, resolve_url=None, cache=None, on_text=None, images=None):
+    render_block = cache.render if cache is not None else block_to_html_node
+    return html_chunks(render_block(block, block_type, resolve_url, on_text, images) for block, block_type in iter_blocks(markdown))
+
+# Yields the HTML of each block node as nodes produces it, inside the same <div> as markdown_to_html_node
+def html_chunks(nodes):
+    yield "<div>"
+    for node in nodes:
+        yield node.to_html()
+    yield "</div>"
+
+# Stands in for a node wherever one is written out (e.g. as a Template value) but
+# writes chunks of HTML as an iterable produces them. Like the iterable, it can
+# only be written once.
+class HtmlStream:
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def _take(self):
+        if self.chunks is None:
+            raise ValueError("HtmlStream has already been written")
+        chunks, self.chunks = self.chunks, None
+        return chunks
+
+    def to_html(self):
+        return "".join(self._take())
+
+    def write_html(self, fp):
+        for chunk in self._take():
+            fp.write(chunk)
@@ -0,0 +1,163 @@
+import os
+import json
+import struct
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from manifest import hash_file_cached, remove_output
+from static_files import scan_files, place_file, same_stat
+
+# Pillow is optional: without it images keep their single size, but pages still
+# get width and height read from the file headers
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+DEFAULT_WIDTHS = (480, 960, 1440)
+JPEG_QUALITY = 80
+# Bump whenever derivatives are produced differently, so cached ones are redone
+IMAGES_VERSION = 1
+
+# Returns (width, height) from a PNG or JPEG header, or None for anything else
+def image_size(path):
+    with open(path, "rb") as f:
+        header = f.read(24)
+        if header[:8] == b"\x89PNG\r\n\x1a\n" and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        if header[:2] != b"\xff\xd8":
+            return None
+        # Walk the JPEG segments up to the start-of-frame marker, which holds the size
+        f.seek(2)
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+                continue
+            length = f.read(2)
+            if len(length) < 2:
+                return None
+            if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                data = f.read(5)
+                if len(data) < 5:
+                    return None
+                height, width = struct.unpack(">HH", data[1:5])
+                return width, height
+            f.seek(struct.unpack(">H", length)[0] - 2, os.SEEK_CUR)
+
+# "images/tom.png" at 480 pixels wide is "images/tom-480w.png"
+def derivative_path(rel_path, width):
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}-{width}w{ext}"
+
+# Names a resized version by its source's hash, its width and the resize settings.
+# Resizing is deterministic, so versions with the same key have the same contents.
+def derivative_key(digest, width):
+    return f"{digest[:20]}-{width}w-{IMAGES_VERSION}-q{JPEG_QUALITY}"
+
+# (image URL, resized version URL, width) of every resized version in an image_table
+def derivatives(table):
+    return [
+        (url, derivative_url, width)
+        for url, image in table.items()
+        for derivative_url, width in image["srcset"]
+        if derivative_url != url
+    ]
+
+def derivative_height(width, height, target_width):
+    return max(1, round(height * target_width / width))
+
+# The widths an image is resized to: every configured width narrower than the original
+def derivative_widths(width, widths):
+    if Image is None:
+        return []
+    return sorted(target for target in set(widths) if target < width)
+
+# What pages need to know about each image in static_dir, keyed by its site URL:
+# its size and the (URL, width) of each resized version, for srcset. Only headers
+# are read, so a shard build can compute it without processing any image.
+def image_table(static_dir, widths=DEFAULT_WIDTHS):
+    table = {}
+    for rel_path in sorted(scan_files(static_dir)):
+        if not rel_path.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        size = image_size(os.path.join(static_dir, rel_path))
+        if size is None:
+            continue
+        width, height = size
+        srcset = [["/" + derivative_path(rel_path, target), target] for target in derivative_widths(width, widths)]
+        if srcset:
+            srcset.append(["/" + rel_path, width])
+        table["/" + rel_path] = {"width": width, "height": height, "srcset": srcset}
+    return table
+
+# Identifies a table, so pages and cached blocks rendered with another one are redone
+def table_digest(table):
+    return hashlib.sha1(json.dumps(table, sort_keys=True).encode()).hexdigest()
+
+# The extra <img> attributes for an image_table entry
+def image_props(image, resolve_url=None):
+    props = {"width": str(image["width"]), "height": str(image["height"])}
+    if image["srcset"]:
+        resolve_url = resolve_url or (lambda url: url)
+        props["srcset"] = ", ".join(f"{resolve_url(url)} {width}w" for url, width in image["srcset"])
+    return props
+
+def _resize(job):
+    src, dst, width = job
+    with Image.open(src) as image:
+        resized = image.resize((width, derivative_height(image.width, image.height, width)), Image.LANCZOS)
+        tmp_path = dst + ".tmp"
+        if image.format == "JPEG":
+            resized.save(tmp_path, image.format, quality=JPEG_QUALITY, optimize=True, progressive=True)
+        else:
+            resized.save(tmp_path, image.format, optimize=True)
+    os.replace(tmp_path, dst)
+
+# Writes the resized versions of every image in static_dir to public_dir. Each one is
+# kept in cache_dir under the source's hash and the resize settings, so an image is
+# only ever processed once; misses are resized in a pool of jobs processes.
+# manifest is the state returned by the previous run. Returns (table, manifest).
+def process_images(static_dir, public_dir, cache_dir, widths=DEFAULT_WIDTHS, jobs=1, manifest=None, link=False):
+    manifest = manifest or {}
+    old_files = manifest.get("files", {})
+    new_files = {}
+    table = image_table(static_dir, widths)
+
+    placements = []
+    work = []
+    for url, derivative_url, width in derivatives(table):
+        src = os.path.join(static_dir, url[1:])
+        if src not in new_files:
+            hash_file_cached(src, old_files, new_files)
+        ext = os.path.splitext(url)[1].lower()
+        cached = os.path.join(cache_dir, derivative_key(new_files[src][2], width) + ext)
+        if not os.path.exists(cached):
+            work.append((src, cached, width))
+        placements.append((cached, derivative_url[1:]))
+
+    if work:
+        os.makedirs(cache_dir, exist_ok=True)
+        if jobs <= 1 or len(work) == 1:
+            for job in work:
+                _resize(job)
+        else:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as executor:
+                list(executor.map(_resize, work))
+
+    published = []
+    for cached, rel_path in placements:
+        dst = os.path.join(public_dir, rel_path)
+        published.append(rel_path)
+        if os.path.exists(dst) and same_stat(os.stat(cached), os.stat(dst)):
+            continue
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        place_file(cached, dst, link)
+    for rel_path in sorted(set(manifest.get("derivatives", [])) - set(published)):
+        remove_output(os.path.join(public_dir, rel_path), public_dir)
+
+    print(f"Images: {len(table)} found, {len(work)} resized, {len(placements) - len(work)} from cache"
+          + ("" if Image is not None else " (install Pillow to generate resized versions)"))
+    return table, {"files": new_files, "derivatives": published}
@@ -0,0 +1,54 @@
+import os
+from urllib.parse import unquote
+
+from urls import is_site_url
+
+# Wraps resolve_url (or the identity, if None) so every URL it maps is also appended to urls
+def recording_resolver(resolve_url, urls):
+    def record(url):
+        urls.append(url)
+        return resolve_url(url) if resolve_url else url
+    return record
+
+# The site URLs among urls, without duplicates, in the order first seen
+def site_links(urls):
+    return list(dict.fromkeys(url for url in urls if is_site_url(url)))
+
+# The path a site URL points at, without query, fragment, index.html or trailing slash
+def link_target(url):
+    path = unquote(url.split("#", 1)[0].split("?", 1)[0])
+    if path.endswith("/index.html"):
+        path = path[:-len("index.html")]
+    return path.rstrip("/") or "/"
+
+# Site-wide index of internal links. pages maps each page's source path to its URL
+# and the site URLs its markdown links to (other fields are ignored); targets maps
+# every linked URL back to the pages linking to it.
+class LinkIndex:
+    def __init__(self, pages=None):
+        self.pages = {source: {"url": entry["url"], "links": entry["links"]} for source, entry in (pages or {}).items()}
+        self.targets = {}
+        for source, entry in sorted(self.pages.items()):
+            for url in entry["links"]:
+                self.targets.setdefault(url, []).append(source)
+
+    # static_files are paths relative to static/. Returns (source, url) for every
+    # link that matches neither a page nor a static file, in source order.
+    def broken(self, static_files=()):
+        known = {link_target(entry["url"]) for entry in self.pages.values()}
+        known.update("/" + path.replace(os.sep, "/") for path in static_files)
+        broken = []
+        for url, sources in self.targets.items():
+            if link_target(url) not in known:
+                broken.extend((source, url) for source in sources)
+        return sorted(broken)
+
+    # Prints one line per broken link plus a summary, and returns the number broken
+    def report(self, static_files=()):
+        broken = self.broken(static_files)
+        for source, url in broken:
+            kind = "file" if os.path.splitext(link_target(url))[1] else "page"
+            print(f"Broken link in {source}: {url} (no such {kind})")
+        link_count = sum(len(sources) for sources in self.targets.values())
+        print(f"Link check: {link_count} internal links to {len(self.targets)} URLs, {len(broken)} broken")
+        return len(broken)
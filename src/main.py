@@ -1,57 +1,321 @@
 import os
 import shutil
 import sys
+import argparse
 from textnode import TextNode
 from markdown_utils import extract_title
 from htmlnode import markdown_to_html_node
 
 from generate_pages import generate_pages_recursive
+from watch import watch
+from manifest import load_manifest, save_manifest
+from static_files import sync_static
+from profiler import Profiler, stage
+from render_cache import RenderCache
+from parse_cache import ParseCache
+from links import LinkIndex
+from search_index import SearchIndex
+from shards import parse_shard, build_shard, load_shards, merge_shards, run_shards
+from images import DEFAULT_WIDTHS, image_table, process_images, table_digest
+from fingerprint import fingerprint_assets, publish_assets
+from precompress import process_outputs
 
 MARKDOWN_PATH = "./content/index.md"
 HTML_OUTPUT_PATH = "./public/index.html"
 TEMPLATE_PATH = "./template.html"
+MANIFEST_PATH = "./.build/manifest.json"
+STATIC_MANIFEST_PATH = "./.build/static.json"
+RENDER_CACHE_PATH = "./.build/render_cache.json"
+SHARDS_PATH = "./.build/shards"
+IMAGES_MANIFEST_PATH = "./.build/images.json"
+IMAGE_CACHE_PATH = "./.build/images"
+FINGERPRINTS_PATH = "./.build/fingerprints.json"
+OUTPUTS_PATH = "./.build/outputs.json"
+PARSE_CACHE_PATH = "./.build/parse_cache"
 
 def main():
-    copy_static_to_public()
-    generate_pages_recursive(base_path=get_args(), public_dir="./docs")
-def copy_static_to_public():
+    if len(sys.argv) > 1 and sys.argv[1] == "watch":
+        args = get_watch_args(sys.argv[2:])
+        watch(lambda: copy_static_to_public(clean=False, link=args.link), base_path=args.base_path, port=args.serve,
+              manifest_path=MANIFEST_PATH)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "merge":
+        args = get_merge_args(sys.argv[2:])
+        # Check the shards before docs/ is cleared for them
+        try:
+            shards = load_shards(args.shard_dirs)
+        except (OSError, ValueError) as e:
+            sys.exit(f"Cannot merge shards: {e}")
+        images = image_table("static", args.image_widths) if args.images else None
+        images_digest = table_digest(images) if images is not None else None
+        assets_digest = table_digest(fingerprint_assets("static", images=images)[0]) if args.fingerprint else None
+        if (shards[0][1]["images"], shards[0][1]["assets"]) != (images_digest, assets_digest):
+            sys.exit("Cannot merge shards: they were built with different --images or --fingerprint settings or static files")
+        static_files = copy_static_to_public(link=args.link)
+        if args.images:
+            images, derivatives = build_images(args.image_widths, args.jobs, args.link)
+            static_files += derivatives
+        if args.fingerprint:
+            build_fingerprints(args.link, images)
+        pages = merge_shards(shards, "./docs")
+        if args.search_index:
+            SearchIndex(pages).write("./docs")
+        if args.minify or args.precompress:
+            build_outputs(static_files, args.minify, args.precompress, args.jobs)
+        # Shards built here share the parse cache, which is pruned once they are all done
+        if args.parse_cache is not None:
+            report_caches(None, make_parse_cache(args))
+        check_links(pages, static_files, args.strict_links)
+        return
+
+    args = get_args()
+    profiler = Profiler() if args.profile or args.profile_json else None
+    if args.shard:
+        # One machine's part of a sharded build; static files, images and links are handled by merge
+        shard, count = args.shard
+        shard_dir = args.shard_dir or os.path.join(SHARDS_PATH, f"{shard}-of-{count}")
+        images = image_table("static", args.image_widths) if args.images else None
+        assets = fingerprint_assets("static", images=images)[0] if args.fingerprint else None
+        cache = make_render_cache(args, images, assets)
+        parse_cache = make_parse_cache(args)
+        build_shard(shard, count, shard_dir, base_path=args.base_path, jobs=args.jobs, cache=cache, images=images, assets=assets, parse_cache=parse_cache)
+        # Other shards may still be writing to the parse cache; the parent or merge prunes it
+        report_caches(cache, parse_cache, prune=False)
+        return
+
+    with stage(profiler, "static"):
+        static_files = copy_static_to_public(clean=not args.incremental, link=args.link)
+    images = None
+    if args.images:
+        with stage(profiler, "images"):
+            images, derivatives = build_images(args.image_widths, args.jobs, args.link)
+        static_files += derivatives
+    assets = None
+    if args.fingerprint:
+        with stage(profiler, "fingerprint"):
+            assets = build_fingerprints(args.link, images)
+    # Shard processes keep their own render caches
+    cache = make_render_cache(args, images, assets) if not args.shards else None
+    parse_cache = make_parse_cache(args)
+    if args.shards:
+        with stage(profiler, "render"):
+            shard_args = ["--images", "--image-widths", ",".join(map(str, args.image_widths))] if args.images else []
+            if args.fingerprint:
+                shard_args.append("--fingerprint")
+            if args.render_cache:
+                shard_args += ["--render-cache", str(args.render_cache)]
+            if parse_cache:
+                shard_args += ["--parse-cache", str(args.parse_cache)]
+            shard_dirs = run_shards(args.shards, SHARDS_PATH, args.base_path, args.jobs, shard_args)
+        pages = merge_shards(load_shards(shard_dirs), "./docs")
+    else:
+        manifest_path = MANIFEST_PATH if args.incremental else None
+        pages = generate_pages_recursive(base_path=args.base_path, public_dir="./docs", manifest_path=manifest_path, jobs=args.jobs, profiler=profiler, cache=cache, pipeline=args.pipeline, images=images, assets=assets, parse_cache=parse_cache)
+    if args.search_index:
+        with stage(profiler, "search"):
+            SearchIndex(pages).write("./docs")
+    if args.minify or args.precompress:
+        with stage(profiler, "outputs"):
+            build_outputs(static_files, args.minify, args.precompress, args.jobs)
+    with stage(profiler, "links"):
+        broken = check_links(pages, static_files)
+
+    report_caches(cache, parse_cache)
+
+    if profiler:
+        profiler.report()
+        if args.profile_json:
+            profiler.write_json(args.profile_json)
+
+    if broken and args.strict_links:
+        sys.exit(1)
+
+def make_render_cache(args, images, assets):
+    if not args.render_cache:
+        return None
+    cache_path = RENDER_CACHE_PATH if args.persist_render_cache else None
+    # Cached blocks depend on the base path and, through their URLs and <img> attributes,
+    # on the asset and image tables
+    salt = args.base_path
+    for table in (images, assets):
+        if table is not None:
+            salt += "\0" + table_digest(table)
+    return RenderCache(args.render_cache, cache_path, salt=salt)
+
+def make_parse_cache(args):
+    if args.parse_cache is None:
+        return None
+    return ParseCache(PARSE_CACHE_PATH, args.parse_cache * 1024 * 1024)
+
+# Prints what the caches did this build and saves them for the next one. Only a
+# process no other build shares the parse cache with should prune it.
+def report_caches(cache, parse_cache, prune=True):
+    if cache:
+        print(cache.summary())
+        cache.save()
+    if parse_cache:
+        if prune:
+            parse_cache.prune()
+        print(parse_cache.summary())
+
+# Resizes the images in static/ into docs/ and returns (image table, resized files)
+def build_images(widths, jobs, link):
+    table, state = process_images("static", "docs", IMAGE_CACHE_PATH, widths, jobs, load_manifest(IMAGES_MANIFEST_PATH), link)
+    save_manifest(IMAGES_MANIFEST_PATH, state)
+    return table, state["derivatives"]
+
+# Fingerprints the files in static/ and the resized versions of images (an image
+# table, if --images), publishes the renamed copies in docs/ and returns the asset table
+def build_fingerprints(link, images=None):
+    state = load_manifest(FINGERPRINTS_PATH)
+    assets, new_state = fingerprint_assets("static", state, images)
+    publish_assets("static", "docs", assets, state.get("assets"), link)
+    save_manifest(FINGERPRINTS_PATH, new_state)
+    return assets
+
+# Minifies the generated pages in docs/ and writes precompressed siblings of its files
+def build_outputs(static_files, minify, precompress, jobs):
+    state = process_outputs("docs", static_files, minify, precompress, jobs, load_manifest(OUTPUTS_PATH))
+    save_manifest(OUTPUTS_PATH, state)
+
+# Reports the broken links among the site's pages, exiting with an error if strict
+def check_links(pages, static_files, strict=False):
+    broken = LinkIndex(pages).report(static_files)
+    if broken and strict:
+        sys.exit(1)
+    return broken
+
+def copy_static_to_public(clean=True, link=False):
     static_dir = "static"
     public_dir = "docs"
 
     # Delete contents of public directory if it exists
-    if os.path.exists(public_dir):
+    # (incremental builds keep it so unchanged pages and assets survive)
+    if clean and os.path.exists(public_dir):
         shutil.rmtree(public_dir)
+    # The pages recorded in the incremental manifest are gone with it, so the next
+    # --incremental build must not trust them
+    if clean and os.path.exists(MANIFEST_PATH):
+        os.remove(MANIFEST_PATH)
 
-    # Create empty public directory
-    os.makedirs(public_dir)
-
-    def copy_recursive(src_path, dst_path):
-        # Create destination directory if it doesn't exist
-        if not os.path.exists(dst_path):
-            os.makedirs(dst_path)
-            print(f"Created directory: {dst_path}")
-
-        # Iterate through items in source directory
-        for item in os.listdir(src_path):
-            src_item = os.path.join(src_path, item)
-            dst_item = os.path.join(dst_path, item)
-
-            if os.path.isdir(src_item):
-                # Recursively copy subdirectories
-                copy_recursive(src_item, dst_item)
-            else:
-                # Copy files
-                shutil.copy2(src_item, dst_item)
-                print(f"Copied file: {dst_item}")
-
-    # Start recursive copy from static to public
-    copy_recursive(static_dir, public_dir)
-
-def get_args():
-    if(len(sys.argv) > 1):
-        return sys.argv[1]
-    else:
-        return  "/"
+    # Create public directory
+    os.makedirs(public_dir, exist_ok=True)
+
+    # Copy only new or changed files and drop the ones removed from static/ since the last sync
+    previous = load_manifest(STATIC_MANIFEST_PATH).get("files", [])
+    files, stats = sync_static(static_dir, public_dir, previous, link)
+    save_manifest(STATIC_MANIFEST_PATH, {"files": files})
+    print(f"Synced {static_dir}/ to {public_dir}/: " + ", ".join(f"{count} {action}" for action, count in stats.items()))
+    return files
+
+def get_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the site from content/ into docs/")
+    parser.add_argument("base_path", nargs="?", default="/", help="URL prefix the site is served under")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"keep docs/ and only re-render pages that changed since the last build (state in {MANIFEST_PATH})")
+    parser.add_argument("--link", action="store_true",
+                        help="hardlink static files into docs/ instead of copying them")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="render pages in N worker processes (0 uses every core)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="prefetch sources and write outputs on background threads while rendering (for slow or networked disks)")
+    parser.add_argument("--render-cache", type=int, nargs="?", const=10000, metavar="SIZE",
+                        help="reuse the HTML of repeated blocks, keeping at most SIZE blocks (default 10000)")
+    parser.add_argument("--persist-render-cache", action="store_true",
+                        help=f"keep the render cache between builds in {RENDER_CACHE_PATH} (implies --render-cache)")
+    parser.add_argument("--parse-cache", type=int, nargs="?", const=64, metavar="MB",
+                        help=f"reuse the parse of unchanged markdown across builds, kept in {PARSE_CACHE_PATH} up to MB megabytes (default 64)")
+    parser.add_argument("--strict-links", action="store_true",
+                        help="exit with an error if any internal link or image is broken")
+    parser.add_argument("--search-index", action="store_true",
+                        help="write a prefix-sharded full-text search index to docs/search/")
+    add_static_args(parser)
+    add_output_args(parser)
+    parser.add_argument("--profile", action="store_true",
+                        help="time every build stage and print the totals and the slowest pages")
+    parser.add_argument("--profile-json", metavar="PATH",
+                        help="also write the profile as JSON to PATH (implies --profile)")
+    parser.add_argument("--shard", type=shard_spec, metavar="K/N",
+                        help="build only shard K of N into --shard-dir, for a sharded build across machines (combine with main.py merge)")
+    parser.add_argument("--shard-dir", metavar="DIR",
+                        help=f"where --shard writes its pages (default {SHARDS_PATH}/K-of-N)")
+    parser.add_argument("--shards", type=int, metavar="N",
+                        help="build the site as N shards in separate local processes, then merge them")
+    args = parser.parse_args(argv)
+    if args.pipeline and args.jobs > 1:
+        parser.error("--pipeline and --jobs cannot be combined")
+    if args.pipeline and (args.profile or args.profile_json):
+        parser.error("--pipeline and --profile cannot be combined: pipelined pages are not timed")
+    if (args.shard or args.shards) and (args.incremental or args.pipeline):
+        parser.error("sharded builds cannot be combined with --incremental or --pipeline")
+    if args.shard and args.shards:
+        parser.error("--shard and --shards cannot be combined")
+    if args.persist_render_cache and args.shards:
+        parser.error("--persist-render-cache cannot be combined with --shards: the shard processes would overwrite each other's cache")
+    if args.persist_render_cache and not args.render_cache:
+        args.render_cache = 10000
+    if args.parse_cache is not None and args.render_cache:
+        parser.error("--parse-cache and --render-cache cannot be combined")
+    if args.parse_cache is not None and args.parse_cache <= 0:
+        parser.error("--parse-cache needs a size of at least 1 MB")
+    if args.jobs <= 0:
+        args.jobs = os.cpu_count() or 1
+    return args
+
+def shard_spec(spec):
+    try:
+        return parse_shard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def get_merge_args(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py merge", description="Combine the shards of a sharded build into docs/")
+    parser.add_argument("shard_dirs", nargs="+", metavar="SHARD_DIR", help="directories written by main.py --shard K/N")
+    parser.add_argument("--link", action="store_true",
+                        help="hardlink static files into docs/ instead of copying them")
+    parser.add_argument("--strict-links", action="store_true",
+                        help="exit with an error if any internal link or image is broken")
+    parser.add_argument("--search-index", action="store_true",
+                        help="write a prefix-sharded full-text search index to docs/search/")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="resize images and compress outputs in N worker processes")
+    parser.add_argument("--parse-cache", type=int, nargs="?", const=64, metavar="MB",
+                        help=f"prune the parse cache the shards shared in {PARSE_CACHE_PATH} to MB megabytes (default 64)")
+    add_static_args(parser)
+    add_output_args(parser)
+    return parser.parse_args(argv)
+
+def image_widths(spec):
+    try:
+        widths = tuple(int(width) for width in spec.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid widths {spec!r}, expected e.g. 480,960")
+    if not widths or min(widths) <= 0:
+        raise argparse.ArgumentTypeError(f"invalid widths {spec!r}, expected e.g. 480,960")
+    return widths
+
+def add_static_args(parser):
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="publish static files under content-hashed names (listed in docs/asset-manifest.json) and link pages to them")
+    parser.add_argument("--images", action="store_true",
+                        help="resize static images for srcset (needs Pillow) and add width and height to <img> tags")
+    parser.add_argument("--image-widths", type=image_widths, default=DEFAULT_WIDTHS, metavar="W,W,...",
+                        help="widths to resize images to (default " + ",".join(map(str, DEFAULT_WIDTHS)) + ")")
+
+def add_output_args(parser):
+    parser.add_argument("--minify", action="store_true",
+                        help="minify the generated HTML, leaving <pre> and <code> contents alone")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write .gz (and, with brotli installed, .br) siblings of every HTML, CSS, JS, JSON, SVG and text file in docs/")
+
+def get_watch_args(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py watch", description="Rebuild docs/ whenever content/, static/ or template.html change")
+    parser.add_argument("base_path", nargs="?", default="/", help="URL prefix the site is served under")
+    parser.add_argument("--serve", type=int, nargs="?", const=8888, metavar="PORT",
+                        help="also serve docs/ over HTTP (default port 8888)")
+    parser.add_argument("--link", action="store_true",
+                        help="hardlink static files into docs/ instead of copying them")
+    return parser.parse_args(argv)
 
 
 
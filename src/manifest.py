@@ -0,0 +1,62 @@
+import os
+import json
+import hashlib
+
+MANIFEST_VERSION = 4
+
+# Returns the hex digest of a file's contents
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Like hash_file, but reuses the hash recorded in old_files while the file's
+# mtime and size are unchanged. The result is recorded in new_files.
+def hash_file_cached(path, old_files, new_files):
+    stat = os.stat(path)
+    signature = [stat.st_mtime_ns, stat.st_size]
+    cached = old_files.get(path)
+    if cached is not None and cached[:2] == signature:
+        digest = cached[2]
+    else:
+        digest = hash_file(path)
+    new_files[path] = signature + [digest]
+    return digest
+
+# Loads the build manifest, or an empty one if it is missing or from another version
+def load_manifest(path):
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+# Writes data (a str, or bytes) to path, creating its directory. It goes to a
+# temporary file first, so an interrupted build never leaves a half-written file.
+def write_atomic(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb" if isinstance(data, bytes) else "w") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def save_manifest(path, manifest):
+    manifest["version"] = MANIFEST_VERSION
+    write_atomic(path, json.dumps(manifest, indent=1, sort_keys=True))
+
+# Removes a generated file and any directories it leaves empty, stopping at root
+def remove_output(path, root):
+    if os.path.exists(path):
+        os.remove(path)
+    root = os.path.abspath(root)
+    directory = os.path.dirname(os.path.abspath(path))
+    while directory != root and directory.startswith(root) and os.path.isdir(directory) and not os.listdir(directory):
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
@@ -0,0 +1,50 @@
+import os
+import mmap
+from contextlib import nullcontext
+
+# Sources at least this large are memory-mapped instead of read into a string
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# Yields the decoded lines of a bytes-like buffer, decoding one line at a time
+def iter_mapped_lines(buffer):
+    start = 0
+    size = len(buffer)
+    while start <= size:
+        end = buffer.find(b"\n", start)
+        if end == -1:
+            end = size
+        yield buffer[start:end].decode("utf-8")
+        start = end + 1
+
+# A memory-mapped markdown file. Iterating it yields its lines, so it can be passed
+# anywhere iter_blocks accepts a source; buffer is the raw mapping for byte searches.
+class MappedMarkdown:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.file.close()
+            raise
+
+    def __iter__(self):
+        return iter_mapped_lines(self.buffer)
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Opens a markdown source for reading: small files come back as a string, large ones
+# as a MappedMarkdown. Use it as a context manager so mappings are released. Both
+# are decoded as UTF-8, whatever the locale, so a file reads the same at any size.
+def open_markdown(path, threshold=MMAP_THRESHOLD):
+    if os.path.getsize(path) >= threshold:
+        return MappedMarkdown(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return nullcontext(f.read())
@@ -9,27 +9,68 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
+IMAGE_PATTERN = re.compile(r'!\[(.*?)\]\((.*?)\)')
+LINK_PATTERN = re.compile(r'\[(.*?)\]\((.*?)\)')
+
 # Extracts all markdown images from a string
 def extract_markdown_images(text):
-    pattern = r'!\[(.*?)\]\((.*?)\)'
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 # Extracts all markdown links from a string
 def extract_markdown_links(text):
-    pattern = r'\[(.*?)\]\((.*?)\)'
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_PATTERN.findall(text)
 
 # Converts markdown to blocks of text
 def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    result = []
-    for block in blocks:
-        stripped = block.strip()
-        if stripped:
-            result.append(stripped)
-    return result
+    return [block for block, _ in iter_blocks(markdown)]
+
+# Yields the lines of text one at a time without splitting it into a list first
+def iter_lines(text):
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+# Yields (block, block_type) pairs in a single pass over the lines of the document.
+# source is a string or any iterable of lines, such as an open file, so only the
+# current block is ever held in memory. Blocks are separated by blank lines,
+# except inside ``` fences, which run until their closing fence.
+def iter_blocks(source):
+    lines = iter_lines(source) if isinstance(source, str) else source
+    block_lines = []
+    in_fence = False
+    for line in lines:
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
+        if in_fence:
+            block_lines.append(line)
+            if stripped.startswith("```"):
+                yield "\n".join(block_lines).strip(), BlockType.CODE
+                block_lines = []
+                in_fence = False
+        elif not stripped:
+            if block_lines:
+                block = "\n".join(block_lines).strip()
+                yield block, block_to_block_type(block)
+                block_lines = []
+        elif not block_lines and stripped.startswith("```"):
+            block_lines.append(line)
+            # A fence that closes on its own line ("```code```") is a whole block
+            if len(stripped) >= 6 and stripped.endswith("```"):
+                yield stripped, BlockType.CODE
+                block_lines = []
+            else:
+                in_fence = True
+        else:
+            block_lines.append(line)
+
+    if block_lines:
+        block = "\n".join(block_lines).strip()
+        yield block, BlockType.CODE if in_fence else block_to_block_type(block)
 
 def block_to_block_type(block):
     if block.startswith("#"):
@@ -45,10 +86,18 @@ def block_to_block_type(block):
     else:
         return BlockType.PARAGRAPH
     
+TITLE_PATTERN = re.compile(r'# (.*)')
+TITLE_PATTERN_BYTES = re.compile(rb'# (.*)')
+
+# markdown is a string or a MappedMarkdown, whose mapping is searched without decoding it
 def extract_title(markdown):
-    pattern = r'# (.*)'
-    match = re.search(pattern, markdown)
-    if match:
-        return match.group(1).strip()
+    if isinstance(markdown, str):
+        match = TITLE_PATTERN.search(markdown)
+        title = match.group(1) if match else None
+    else:
+        match = TITLE_PATTERN_BYTES.search(markdown.buffer)
+        title = match.group(1).decode("utf-8") if match else None
+    if title is not None:
+        return title.strip()
     else:
         raise Exception("No title found in markdown")
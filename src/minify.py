@@ -0,0 +1,51 @@
+import re
+
+# Elements whose content is kept byte for byte: whitespace matters inside them
+PRESERVED = re.compile(r"<(pre|code|textarea|script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+WHITESPACE = re.compile(r"\s+")
+# A whole tag, captured with its name. Quoted attribute values may hold any character, ">" included.
+TAG = re.compile(r"""</?([a-zA-Z][\w-]*|!doctype)(?:[^>"']|"[^"]*"|'[^']*')*>""", re.IGNORECASE)
+COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+
+# Tags that never render the whitespace around them, so it can be dropped entirely.
+# Next to inline tags (a, b, i, img, ...) a single space is kept, as browsers show it.
+BLOCK_TAGS = frozenset("""
+    !doctype html head body title meta link base div p article section nav aside header footer main
+    h1 h2 h3 h4 h5 h6 ul ol li dl dt dd blockquote figure figcaption table thead tbody tfoot tr th td
+    form fieldset hr br pre
+""".split())
+
+# Collapses the whitespace in the text between tags. Tags themselves are copied as
+# they are, so attribute values (title, alt, content, ...) keep their whitespace.
+def _minify_text(text):
+    text = COMMENT.sub("", text)
+    minified = []
+    position = 0
+    previous = None
+    for match in TAG.finditer(text):
+        between = WHITESPACE.sub(" ", text[position:match.start()])
+        name = match.group(1).lower()
+        if between == " " and previous is not None and (previous in BLOCK_TAGS or name in BLOCK_TAGS):
+            between = ""
+        minified.append(between)
+        minified.append(match.group(0))
+        previous = name
+        position = match.end()
+    minified.append(WHITESPACE.sub(" ", text[position:]))
+    return "".join(minified)
+
+PLACEHOLDER = re.compile(r"<[a-zA-Z]+ \x00(\d+)>")
+
+# Minifies html without changing how it renders: comments go, runs of whitespace
+# become one space, and whitespace next to block-level tags is removed. The contents
+# of pre, code, textarea, script and style elements are left untouched.
+def minify_html(html):
+    # Preserved elements are swapped for a bare opening tag while the rest is
+    # minified, so the whitespace around them is still judged by their tag name
+    preserved = []
+
+    def protect(match):
+        preserved.append(match.group(0))
+        return f"<{match.group(1)} \x00{len(preserved) - 1}>"
+    text = _minify_text(PRESERVED.sub(protect, html)).strip()
+    return PLACEHOLDER.sub(lambda match: preserved[int(match.group(1))], text)
@@ -0,0 +1,173 @@
+import os
+import time
+import struct
+import marshal
+import hashlib
+
+from htmlnode import LeafNode, ParentNode, block_parts, text_node_to_html_node
+from markdown_utils import iter_blocks
+from split_nodes import scan_textnodes, INLINE_MARKUP
+from textnode import TextNode, TextType
+
+# Bump whenever parsing changes, so documents parsed by older builds are ignored
+PARSE_CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Every entry file starts with the magic, the version and the length of the marshal payload
+MAGIC = b"SSGP"
+HEADER = struct.Struct("<4sHI")
+ENTRY_SUFFIX = ".bin"
+# marshal's format changes between Python versions, so it is pinned and part of the key
+MARSHAL_VERSION = 4
+# Temporary files older than this are left over from interrupted writes; younger
+# ones may belong to a process still writing its entry
+STALE_TMP_SECONDS = 3600
+
+TEXT_TYPES = {text_type.value: text_type for text_type in TextType}
+
+# A parsed document is a list of (tag, parts) blocks, with parts as from block_parts.
+# Inline text without markup stays a string; anything else becomes a list of
+# (text type, text, url) spans. Code is kept as its raw string. It holds only
+# lists, tuples and strings, so marshal stores it compactly and loads it fast.
+def parse_markdown(markdown):
+    document = []
+    for block, block_type in iter_blocks(markdown):
+        tag, parts = block_parts(block, block_type)
+        if tag != "pre":
+            parts = [parse_inline(part) for part in parts]
+        document.append((tag, parts))
+    return document
+
+def parse_inline(text):
+    if not INLINE_MARKUP.search(text):
+        return text
+    return [(node.text_type.value, node.text, node.url) for node in scan_textnodes(text)]
+
+def _inline_children(inline, resolve_url, on_text, images):
+    if isinstance(inline, str):
+        if on_text and inline:
+            on_text(inline)
+        return [LeafNode(None, inline)] if inline else []
+    if on_text:
+        for _, text, _ in inline:
+            on_text(text)
+    return [text_node_to_html_node(TextNode(text, TEXT_TYPES[text_type], url), resolve_url, images) for text_type, text, url in inline]
+
+# Yields the HTML node of each block of a parsed document, the same nodes block_to_html_node
+# makes. URLs, on_text and images are applied here, so a cached document does not depend on them.
+def document_to_html_nodes(document, resolve_url=None, on_text=None, images=None):
+    for tag, parts in document:
+        if tag == "pre":
+            yield ParentNode("pre", [LeafNode("code", parts[0])])
+        elif tag == "ul" or tag == "ol":
+            yield ParentNode(tag, [ParentNode("li", _inline_children(item, resolve_url, on_text, images)) for item in parts])
+        else:
+            yield ParentNode(tag, _inline_children(parts[0], resolve_url, on_text, images))
+
+# Parsed documents stored on disk, one file per document under directory, named by
+# the hash of the markdown and the parser version. A hit refreshes the file's mtime,
+# and prune() deletes the least recently used files until the cache fits in
+# max_bytes. Writes are atomic and every process writes its own temporary file, so
+# workers and shard processes can share one directory, but only one process should
+# prune it, once the others are done. The directory can be saved and restored
+# between CI runs as it is.
+class ParseCache:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        # Arguments to build an equivalent cache in a worker process
+        self.settings = (directory, max_bytes)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        # What prune() left in the directory, (documents, bytes), or None before it runs
+        self.stored = None
+
+    # markdown is a string: memory-mapped sources are too large to cache whole
+    def key(self, markdown):
+        return hashlib.sha256(f"{PARSE_CACHE_VERSION}\0{MARSHAL_VERSION}\0{markdown}".encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, version, length = HEADER.unpack_from(data)
+            if magic != MAGIC or version != PARSE_CACHE_VERSION or length != len(data) - HEADER.size:
+                raise ValueError(f"Bad parse cache entry {path}")
+            document = marshal.loads(data[HEADER.size:])
+            os.utime(path)
+        except (OSError, ValueError, EOFError, TypeError, struct.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return document
+
+    def put(self, key, document):
+        payload = marshal.dumps(document, MARSHAL_VERSION)
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, PARSE_CACHE_VERSION, len(payload)))
+            f.write(payload)
+        try:
+            os.replace(tmp_path, path)
+        except FileNotFoundError:
+            # Removed by a prune that took it for a leftover: the entry is simply not stored
+            pass
+
+    # The parsed document of markdown, from the cache or parsed and stored now
+    def parse(self, markdown):
+        key = self.key(markdown)
+        document = self.get(key)
+        if document is None:
+            document = parse_markdown(markdown)
+            self.put(key, document)
+        return document
+
+    # Same nodes as block_to_html_node makes for each block of markdown
+    def render(self, markdown, resolve_url=None, on_text=None, images=None):
+        return document_to_html_nodes(self.parse(markdown), resolve_url, on_text, images)
+
+    # Deletes the least recently used entries until the rest fit in max_bytes, plus
+    # temporary files left by interrupted writes. Files another process removed
+    # meanwhile are skipped.
+    def prune(self):
+        entries = []
+        stale = time.time() - STALE_TMP_SECONDS
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    try:
+                        stat = entry.stat()
+                        if entry.name.endswith(ENTRY_SUFFIX):
+                            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                        elif entry.name.endswith(".tmp") and stat.st_mtime < stale:
+                            os.remove(entry.path)
+                    except FileNotFoundError:
+                        pass
+        except FileNotFoundError:
+            return
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and total > self.max_bytes:
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+                self.evicted += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.stored = (len(entries), total)
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        summary = f"Parse cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate)"
+        if self.stored is not None:
+            count, total = self.stored
+            summary += f", {count} documents ({total / 1e6:.1f} MB), {self.evicted} evicted"
+        return summary
@@ -0,0 +1,102 @@
+import os
+import gzip
+from concurrent.futures import ProcessPoolExecutor
+
+from manifest import remove_output, write_atomic
+from static_files import scan_files
+from minify import minify_html
+
+# Brotli is optional: without it only the gzip siblings are written
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".xml", ".txt")
+# Bump whenever outputs are minified or compressed differently, so they are all redone
+OUTPUTS_VERSION = 2
+
+# Compressed sibling extension -> compressor. Both use their highest level, as each
+# output is compressed once and then served many times. gzip's mtime is fixed so
+# unchanged outputs compress to the same bytes.
+def available_encodings():
+    encodings = {"gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encodings["br"] = lambda data: brotli.compress(data, quality=11)
+    return encodings
+
+# Minifies one output in place and writes its compressed siblings.
+# Returns (size before, size after minifying).
+def _process(job):
+    path, minify, encodings = job
+    with open(path, "rb") as f:
+        data = f.read()
+    size = len(data)
+    if minify:
+        minified = minify_html(data.decode("utf-8")).encode("utf-8")
+        if minified != data:
+            write_atomic(path, minified)
+            data = minified
+    compressors = available_encodings()
+    for ext in encodings:
+        write_atomic(f"{path}.{ext}", compressors[ext](data))
+    return size, len(data)
+
+# Post-processes the files in public_dir after a build: generated HTML is minified
+# (unless minify is False) and every compressible file gets precompressed siblings
+# (index.html.gz, index.html.br, ...) for the web server to send as they are.
+# skip_minify lists paths relative to public_dir that are copies of static files,
+# which are never rewritten. Outputs whose mtime and size match the state returned
+# last time are skipped; the rest are handled in a pool of jobs processes.
+# Returns the new state.
+def process_outputs(public_dir, skip_minify=(), minify=True, compress=True, jobs=1, state=None):
+    encodings = sorted(available_encodings()) if compress else []
+    settings = [OUTPUTS_VERSION, minify, encodings]
+    state = state or {}
+    old_files = state.get("files", {}) if state.get("settings") == settings else {}
+    skip_minify = set(skip_minify)
+
+    outputs = {}
+    for rel_path, stat in scan_files(public_dir).items():
+        lower = rel_path.lower()
+        should_minify = minify and lower.endswith(".html") and rel_path not in skip_minify
+        if should_minify or (compress and lower.endswith(COMPRESSIBLE_EXTENSIONS)):
+            outputs[rel_path] = (stat, should_minify)
+
+    new_files = {}
+    work = []
+    for rel_path, (stat, should_minify) in sorted(outputs.items()):
+        path = os.path.join(public_dir, rel_path)
+        signature = [stat.st_mtime_ns, stat.st_size]
+        if old_files.get(rel_path) == signature and all(os.path.exists(f"{path}.{ext}") for ext in encodings):
+            new_files[rel_path] = signature
+            continue
+        work.append((path, should_minify, encodings))
+
+    if jobs <= 1 or len(work) <= 1:
+        sizes = [_process(job) for job in work]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as executor:
+            sizes = list(executor.map(_process, work, chunksize=max(1, len(work) // (jobs * 4))))
+    for path, _, _ in work:
+        stat = os.stat(path)
+        new_files[os.path.relpath(path, public_dir)] = [stat.st_mtime_ns, stat.st_size]
+
+    # Drop the siblings of outputs that went away, and those of encodings no longer written
+    removed = 0
+    old_encodings = state.get("settings", [None, None, []])[2]
+    for rel_path in sorted(state.get("files", {})):
+        for ext in old_encodings:
+            if rel_path not in outputs or ext not in encodings:
+                sibling = os.path.join(public_dir, f"{rel_path}.{ext}")
+                if os.path.exists(sibling):
+                    remove_output(sibling, public_dir)
+                    removed += 1
+
+    minified = [(before, after) for (path, should_minify, _), (before, after) in zip(work, sizes) if should_minify]
+    before = sum(size for size, _ in minified)
+    saved = f" ({100 * (before - sum(size for _, size in minified)) / before:.1f}% smaller)" if before else ""
+    print(f"Outputs: {len(minified)} minified{saved}, {len(work) if encodings else 0} compressed "
+          f"as {'/'.join(encodings) or 'nothing'}, {len(outputs) - len(work)} unchanged, {removed} stale removed"
+          + ("" if brotli is not None or not compress else " (install brotli to also write .br)"))
+    return {"settings": settings, "files": new_files}
@@ -0,0 +1,73 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+_untimed = nullcontext()
+
+# Times the enclosed block into timings[name], or does nothing when timings is None
+def timed(timings, name):
+    if timings is None:
+        return _untimed
+    return _timer(timings, name)
+
+# Times the enclosed block as a build stage of profiler, if there is one
+def stage(profiler, name):
+    if profiler is None:
+        return _untimed
+    return profiler.stage(name)
+
+@contextmanager
+def _timer(timings, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+# Collects build-level stage timings plus per-page stage timings and output sizes
+class Profiler:
+    def __init__(self):
+        self.stages = {}
+        self.page_stages = {}
+        self.pages = []
+
+    def stage(self, name):
+        return timed(self.stages, name)
+
+    # timings is the dict filled in by render_page: seconds per stage plus "size" in bytes
+    def record_page(self, path, timings):
+        timings = dict(timings)
+        size = timings.pop("size", 0)
+        for name, seconds in timings.items():
+            self.page_stages[name] = self.page_stages.get(name, 0.0) + seconds
+        self.pages.append({"path": path, "seconds": sum(timings.values()), "size": size, "stages": timings})
+
+    def slowest_pages(self, count=10):
+        return sorted(self.pages, key=lambda page: page["seconds"], reverse=True)[:count]
+
+    def to_dict(self):
+        return {
+            "stages": self.stages,
+            "page_stages": self.page_stages,
+            "pages": self.pages,
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    def report(self, count=10):
+        total_size = sum(page["size"] for page in self.pages)
+        print(f"Build profile: {len(self.pages)} pages rendered, {total_size / 1024:.1f} KB written")
+        print("  Build stages:")
+        for name, seconds in self.stages.items():
+            print(f"    {name:<12} {seconds * 1000:>10.1f} ms")
+        if self.page_stages:
+            # Summed over pages, so with --jobs these add up to more than the wall time
+            print("  Page stages (summed over pages):")
+            for name, seconds in self.page_stages.items():
+                print(f"    {name:<12} {seconds * 1000:>10.1f} ms")
+        if self.pages:
+            print("  Slowest pages:")
+            for page in self.slowest_pages(count):
+                print(f"    {page['seconds'] * 1000:>8.2f} ms {page['size'] / 1024:>8.1f} KB  {page['path']}")
@@ -0,0 +1,93 @@
+import json
+import hashlib
+from collections import OrderedDict
+
+from htmlnode import LeafNode, block_to_html_node
+from links import recording_resolver
+from manifest import write_atomic
+
+# Bump whenever block rendering changes, so cached HTML from older builds is ignored
+RENDER_CACHE_VERSION = 3
+
+# Bounded LRU cache of rendered block HTML, keyed by a hash of the block text and
+# type. salt must capture anything else that changes the output, such as the base
+# path and the image table.
+class RenderCache:
+    def __init__(self, maxsize=10000, path=None, salt=""):
+        # Arguments to build an equivalent cache in a worker process
+        self.settings = (maxsize, path, salt)
+        self.maxsize = maxsize
+        self.path = path
+        self.salt = f"{RENDER_CACHE_VERSION}\0{salt}"
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # When a list, every entry put is also appended to it, so a worker process
+        # can hand what it rendered back to the parent's cache
+        self.added = None
+        if path is not None:
+            self.load()
+
+    def key(self, block, block_type):
+        return hashlib.sha1(f"{self.salt}\0{block_type.value}\0{block}".encode()).hexdigest()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    # entry is the block's HTML plus the URLs it passed to resolve_url and the texts it passed to on_text
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if self.added is not None:
+            self.added.append((key, entry))
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    # Same as block_to_html_node, but a block seen before comes back as one raw-HTML leaf.
+    # Its URLs and texts are passed to resolve_url and on_text again, so hooks that
+    # record links or index text still see them.
+    def render(self, block, block_type, resolve_url=None, on_text=None, images=None):
+        key = self.key(block, block_type)
+        entry = self.get(key)
+        if entry is None:
+            urls = []
+            texts = []
+            html = block_to_html_node(block, block_type, recording_resolver(resolve_url, urls), texts.append, images).to_html()
+            self.put(key, (html, urls, texts))
+        else:
+            html, urls, texts = entry
+            if resolve_url:
+                for url in urls:
+                    resolve_url(url)
+        if on_text:
+            for text in texts:
+                on_text(text)
+        return LeafNode(None, html)
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("salt") != self.salt:
+            return
+        for key, html, urls, texts in data["entries"][-self.maxsize:]:
+            self.entries[key] = (html, urls, texts)
+
+    def save(self):
+        if self.path is None:
+            return
+        # Entries are stored least recently used first, so load() keeps the LRU order
+        write_atomic(self.path, json.dumps({"salt": self.salt, "entries": [[key, *entry] for key, entry in self.entries.items()]}))
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        return f"Render cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate), {len(self.entries)} entries"
@@ -0,0 +1,102 @@
+import os
+import re
+import json
+
+SEARCH_DIR = "search"
+# Terms are sharded by their first PREFIX_LENGTH characters, so a browser only
+# fetches the shard for what is being typed
+PREFIX_LENGTH = 2
+TOKEN = re.compile(r"\w+")
+
+# The search terms of text: lowercased words of two or more characters
+def tokenize(text):
+    return [token for token in TOKEN.findall(text.lower()) if len(token) > 1]
+
+# Counts the terms of every text it is called with; pass one as the on_text hook
+# of markdown_to_html_node to index a page while it is parsed
+class TermCounter:
+    def __init__(self):
+        self.terms = {}
+
+    def __call__(self, text):
+        terms = self.terms
+        for token in tokenize(text):
+            terms[token] = terms.get(token, 0) + 1
+
+# Keeps the ids of pages still in urls where they were in previous_urls, so their
+# postings do not change; new pages fill the ids of deleted ones first
+def assign_ids(previous_urls, urls):
+    slots = [url if url in urls else None for url in previous_urls]
+    free = [i for i, url in enumerate(slots) if url is None]
+    placed = set(slots)
+    for url in sorted(urls):
+        if url in placed:
+            continue
+        if free:
+            slots[free.pop(0)] = url
+        else:
+            slots.append(url)
+    while slots and slots[-1] is None:
+        slots.pop()
+    return slots
+
+# Inverted index of the site. pages maps each page's source path to its URL,
+# title and term counts, as recorded during the build. It is written as
+# search/index.json, the page table, plus one search/<prefix>.json shard per term
+# prefix mapping each term to [page id, count] postings.
+class SearchIndex:
+    def __init__(self, pages):
+        self.pages = {entry["url"]: entry for entry in pages.values()}
+
+    def postings(self, ids):
+        shards = {}
+        for page_id, url in enumerate(ids):
+            if url is None:
+                continue
+            for term, count in self.pages[url]["terms"].items():
+                shard = shards.setdefault(term[:PREFIX_LENGTH], {})
+                shard.setdefault(term, []).append([page_id, count])
+        return shards
+
+    # Writes the index under public_dir/search/, keeping page ids from the index
+    # already there. Files whose contents are unchanged are not rewritten, so an
+    # edited page only touches the shards of its own terms.
+    def write(self, public_dir):
+        directory = os.path.join(public_dir, SEARCH_DIR)
+        table_path = os.path.join(directory, "index.json")
+        try:
+            with open(table_path, "r") as f:
+                previous = [page and page[0] for page in json.load(f)["pages"]]
+        except (OSError, ValueError, KeyError):
+            previous = []
+        ids = assign_ids(previous, self.pages.keys())
+        shards = self.postings(ids)
+
+        os.makedirs(directory, exist_ok=True)
+        files = {table_path: {
+            "prefix": PREFIX_LENGTH,
+            "pages": [[url, self.pages[url]["title"]] if url else None for url in ids],
+            "shards": sorted(shards),
+        }}
+        for prefix, terms in shards.items():
+            files[os.path.join(directory, prefix + ".json")] = terms
+        written = 0
+        for path, data in files.items():
+            text = json.dumps(data, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+            if _read(path) != text:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                written += 1
+        # Drop shards of prefixes no page uses any more
+        for name in os.listdir(directory):
+            if os.path.join(directory, name) not in files:
+                os.remove(os.path.join(directory, name))
+        print(f"Search index: {len(self.pages)} pages, {sum(len(terms) for terms in shards.values())} terms "
+              f"in {len(shards)} shards ({written} files written)")
+
+def _read(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import subprocess
+
+from generate_pages import find_pages, generate_pages
+from images import table_digest
+
+SHARD_MANIFEST = "shard.json"
+
+# Parses "K/N" (shard K of N, counting from 1) into (K, N)
+def parse_shard(spec):
+    try:
+        shard, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {spec!r}, expected K/N") from None
+    if not 1 <= shard <= count:
+        raise ValueError(f"Invalid shard {spec!r}, K must be between 1 and N")
+    return shard, count
+
+# The shard (counting from 0) a page belongs to. It depends only on the source path
+# relative to content_dir, so every machine assigns pages the same way.
+def shard_of(page, content_dir, count):
+    path = os.path.relpath(page.source, content_dir).replace(os.sep, "/")
+    return int(hashlib.sha1(path.encode()).hexdigest()[:8], 16) % count
+
+def select_shard(pages, content_dir, shard, count):
+    return [page for page in pages if shard_of(page, content_dir, count) == shard - 1]
+
+# Renders shard K of N into shard_dir/public and records its pages' URLs and PageInfo
+# in shard_dir/shard.json, which merge_shards combines for the site-wide indexes
+def build_shard(shard, count, shard_dir, content_dir="./content", template_path="./template.html", base_path="/", jobs=1, cache=None, images=None, assets=None, parse_cache=None):
+    if os.path.exists(shard_dir):
+        shutil.rmtree(shard_dir)
+    public_dir = os.path.join(shard_dir, "public")
+    pages = select_shard(find_pages(content_dir, public_dir, template_path), content_dir, shard, count)
+    # A shard may have no pages, but merge_shards still expects its public directory
+    os.makedirs(public_dir)
+    infos = generate_pages(pages, base_path, jobs, cache=cache, images=images, assets=assets, parse_cache=parse_cache)
+    with open(os.path.join(shard_dir, SHARD_MANIFEST), "w") as f:
+        json.dump({
+            "shard": shard,
+            "count": count,
+            "base_path": base_path,
+            "images": table_digest(images) if images is not None else None,
+            "assets": table_digest(assets) if assets is not None else None,
+            "pages": {page.source: dict(infos[page.source], url=page.url) for page in pages},
+        }, f, indent=1, sort_keys=True)
+    print(f"Built shard {shard}/{count}: {len(pages)} pages in {shard_dir}")
+
+# Reads the shard.json of every shard directory and returns (directory, manifest) pairs.
+# Raises ValueError unless they hold exactly one complete build of each shard.
+def load_shards(shard_dirs):
+    manifests = []
+    for shard_dir in shard_dirs:
+        with open(os.path.join(shard_dir, SHARD_MANIFEST), "r") as f:
+            manifests.append(json.load(f))
+    if not manifests:
+        raise ValueError("No shards to merge")
+    count = manifests[0]["count"]
+    settings = [(manifest["count"], manifest["base_path"], manifest["images"], manifest["assets"]) for manifest in manifests]
+    if len(set(settings)) > 1:
+        raise ValueError("Shards come from builds with different shard counts, base paths, images or assets")
+    shards = sorted(manifest["shard"] for manifest in manifests)
+    if shards != list(range(1, count + 1)):
+        raise ValueError(f"Expected shards 1 to {count} once each, got {shards}")
+    return list(zip(shard_dirs, manifests))
+
+# Copies the pages of every shard from load_shards into public_dir and returns the
+# site's pages for LinkIndex and SearchIndex, like generate_pages_recursive
+def merge_shards(shards, public_dir):
+    pages = {}
+    for shard_dir, manifest in shards:
+        # Shards never share a page, so their trees can be laid over each other
+        shutil.copytree(os.path.join(shard_dir, "public"), public_dir, dirs_exist_ok=True)
+        pages.update(manifest["pages"])
+    print(f"Merged {len(shards)} shards into {public_dir}: {len(pages)} pages")
+    return pages
+
+# Builds all count shards as separate local processes, as separate machines would,
+# and returns their directories under root. extra_args are passed on to main.py.
+def run_shards(count, root, base_path="/", jobs=1, extra_args=()):
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    shard_dirs = [os.path.join(root, f"{shard}-of-{count}") for shard in range(1, count + 1)]
+    processes = [
+        subprocess.Popen([sys.executable, main_path, base_path, "--shard", f"{shard}/{count}",
+                          "--shard-dir", shard_dir, "--jobs", str(jobs), *extra_args])
+        for shard, shard_dir in enumerate(shard_dirs, 1)
+    ]
+    failed = [shard for shard, process in enumerate(processes, 1) if process.wait() != 0]
+    if failed:
+        raise RuntimeError(f"Shard build failed: {', '.join(f'{shard}/{count}' for shard in failed)}")
+    return shard_dirs
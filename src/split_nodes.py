@@ -1,6 +1,31 @@
+import re
 from textnode import TextNode, TextType
 from markdown_utils import extract_markdown_images, extract_markdown_links
 
+# One alternation per inline construct, tried left to right at every position.
+# Images and links stay on one line (like extract_markdown_images/links) while
+# delimited spans may cross newlines (like split_nodes_delimiter). A delimiter
+# with no partner falls through to the last group so we can reject it.
+INLINE_TOKENS = re.compile(
+    r'!\[(?P<alt>.*?)\]\((?P<src>.*?)\)'
+    r'|\[(?P<anchor>.*?)\]\((?P<href>.*?)\)'
+    r'|\*\*(?P<bold>[\s\S]*?)\*\*'
+    r'|\*(?!\*)(?P<italic>[\s\S]*?)\*'
+    r'|_(?P<underscore>[\s\S]*?)_'
+    r'|`(?P<code>[\s\S]*?)`'
+    r'|(?P<unclosed>\*\*|\*|_|`)'
+)
+
+# Every inline construct starts with one of these, so text without them is plain
+INLINE_MARKUP = re.compile(r'[\[*_`]')
+
+DELIMITED_TYPES = {
+    "bold": TextType.BOLD,
+    "italic": TextType.ITALIC,
+    "underscore": TextType.ITALIC,
+    "code": TextType.CODE,
+}
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
     for old_node in old_nodes:
@@ -82,19 +107,36 @@ def split_nodes_link(old_nodes):
             
     return new_nodes
 
+# Splits text into inline nodes. Most prose has no markup at all, which one
+# character-class search detects without running the full scanner.
 def text_to_textnodes(text):
-    # Start with a single text node containing the entire text
-    nodes = [TextNode(text, TextType.TEXT)]
-    
-    # Split by images first
-    nodes = split_nodes_image(nodes)
-    
-    # Then split by links
-    nodes = split_nodes_link(nodes)
-    
-    # Finally split by delimiters
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    
-    return nodes
\ No newline at end of file
+    if not INLINE_MARKUP.search(text):
+        return [TextNode(text, TextType.TEXT)] if text else []
+    return scan_textnodes(text)
+
+# Splits text into inline nodes in a single left-to-right scan
+def scan_textnodes(text):
+    nodes = []
+    curr_index = 0
+    for match in INLINE_TOKENS.finditer(text):
+        kind = match.lastgroup
+        if kind == "unclosed":
+            raise ValueError("Invalid markdown - unclosed delimiter")
+
+        if match.start() > curr_index:
+            nodes.append(TextNode(text[curr_index:match.start()], TextType.TEXT))
+        curr_index = match.end()
+
+        if kind == "src":
+            nodes.append(TextNode(match.group("alt"), TextType.IMAGE, match.group("src")))
+        elif kind == "href":
+            nodes.append(TextNode(match.group("anchor"), TextType.LINK, match.group("href")))
+        else:
+            # Empty spans such as "****" produce nothing, as with split_nodes_delimiter
+            inner = match.group(kind)
+            if inner:
+                nodes.append(TextNode(inner, DELIMITED_TYPES[kind]))
+
+    if curr_index < len(text):
+        nodes.append(TextNode(text[curr_index:], TextType.TEXT))
+    return nodes
@@ -0,0 +1,85 @@
+import os
+import sys
+import shutil
+from manifest import remove_output
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Linux ioctl that makes dst share src's data blocks (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+# Returns {relative path: os.stat_result} for every file under directory
+def scan_files(directory):
+    files = {}
+
+    def scan(path, prefix):
+        with os.scandir(path) as entries:
+            for entry in entries:
+                rel_path = prefix + entry.name
+                if entry.is_dir():
+                    scan(entry.path, rel_path + "/")
+                else:
+                    files[rel_path] = entry.stat()
+
+    if os.path.isdir(directory):
+        scan(directory, "")
+    return files
+
+# True when two stats look like the same file contents: copies and links keep the mtime
+def same_stat(a, b):
+    return a.st_size == b.st_size and a.st_mtime_ns == b.st_mtime_ns
+
+def _reflink(src, dst):
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+    except OSError:
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+# Places src at dst as a hardlink, a reflink or a plain copy, in that order of
+# preference. Returns how the file was placed.
+def place_file(src, dst, link=False):
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if link:
+        try:
+            os.link(src, dst)
+            return "linked"
+        except OSError:
+            pass
+    if _reflink(src, dst):
+        return "cloned"
+    shutil.copy2(src, dst)
+    return "copied"
+
+# Makes public_dir contain every file under static_dir, touching only files whose
+# size or mtime differ. Files listed in previous (the result of the last sync)
+# that no longer exist in static_dir are deleted; anything else in public_dir,
+# such as generated pages, is left alone. Returns (synced files, stats).
+def sync_static(static_dir, public_dir, previous=(), link=False):
+    stats = {"copied": 0, "cloned": 0, "linked": 0, "unchanged": 0, "removed": 0}
+    sources = scan_files(static_dir)
+    targets = scan_files(public_dir)
+
+    for rel_path, src_stat in sorted(sources.items()):
+        dst_stat = targets.get(rel_path)
+        if dst_stat is not None and same_stat(dst_stat, src_stat):
+            stats["unchanged"] += 1
+            continue
+        dst = os.path.join(public_dir, rel_path)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        stats[place_file(os.path.join(static_dir, rel_path), dst, link)] += 1
+
+    for rel_path in sorted(set(previous) - sources.keys()):
+        if rel_path in targets:
+            remove_output(os.path.join(public_dir, rel_path), public_dir)
+            stats["removed"] += 1
+
+    return sorted(sources), stats
@@ -0,0 +1,118 @@
+import os
+import re
+
+TEMPLATE_NAME = "template.html"
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+# {{> partials/footer.html }} pulls in another file, relative to the including file
+INCLUDE = re.compile(r"\{\{>\s*([^\s}]+)\s*\}\}")
+URL_ATTRIBUTE = re.compile(r'\b(href|src)="([^"]*)"')
+
+# Compiled templates keyed by (path, resolve_url), each stored with the file stat it was built from
+_template_cache = {}
+
+# Returns text with its includes expanded, adding every included path to dependencies
+def expand_includes(text, directory, dependencies, including=()):
+    def include(match):
+        path = os.path.normpath(os.path.join(directory, match.group(1)))
+        if path in including:
+            raise ValueError(f"Template include cycle: {' -> '.join(including + (path,))}")
+        if path not in dependencies:
+            dependencies.append(path)
+        with open(path, "r") as f:
+            return expand_includes(f.read(), os.path.dirname(path), dependencies, including + (path,))
+    return INCLUDE.sub(include, text)
+
+class Template:
+    # path is where the template was read from; includes are resolved next to it
+    def __init__(self, text, resolve_url=None, path=None):
+        # Files pulled in with {{> ... }}, so builds can track what a page depends on
+        self.dependencies = []
+        if INCLUDE.search(text):
+            directory = os.path.dirname(path) if path else "."
+            including = (os.path.normpath(path),) if path else ()
+            text = expand_includes(text, directory, self.dependencies, including)
+
+        # The template's own URLs are rewritten once here rather than on every page
+        if resolve_url is not None:
+            text = URL_ATTRIBUTE.sub(lambda match: f'{match.group(1)}="{resolve_url(match.group(2))}"', text)
+
+        # (literal, name, placeholder) triples: each literal is followed by the named slot.
+        # The final triple has no slot and only carries the trailing literal.
+        self.segments = []
+        self.slots = set()
+        # Slots used more than once, whose values must be written out repeatedly
+        self.repeated = set()
+        curr_index = 0
+        for match in PLACEHOLDER.finditer(text):
+            self.segments.append((text[curr_index:match.start()], match.group(1), match.group(0)))
+            if match.group(1) in self.slots:
+                self.repeated.add(match.group(1))
+            self.slots.add(match.group(1))
+            curr_index = match.end()
+        self.segments.append((text[curr_index:], None, None))
+
+    # Writes the template to fp. Values are strings or nodes with write_html();
+    # placeholders without a value are written back unchanged.
+    def write(self, fp, values):
+        for literal, name, placeholder in self.segments:
+            fp.write(literal)
+            if name is None:
+                continue
+            value = values.get(name)
+            if value is None:
+                fp.write(placeholder)
+            elif hasattr(value, "write_html"):
+                value.write_html(fp)
+            else:
+                fp.write(value)
+
+    def render(self, values):
+        parts = []
+        for literal, name, placeholder in self.segments:
+            parts.append(literal)
+            if name is None:
+                continue
+            value = values.get(name)
+            if value is None:
+                parts.append(placeholder)
+            elif hasattr(value, "to_html"):
+                parts.append(value.to_html())
+            else:
+                parts.append(value)
+        return "".join(parts)
+
+def _signature(paths):
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature.append((stat.st_mtime_ns, stat.st_size))
+    return signature
+
+# Returns the compiled template at path, re-reading it only when it or one of its includes changes
+def load_template(path, resolve_url=None):
+    key = (path, resolve_url)
+    cached = _template_cache.get(key)
+    if cached is not None:
+        signature, template = cached
+        try:
+            if _signature([path] + template.dependencies) == signature:
+                return template
+        except FileNotFoundError:
+            pass
+    with open(path, "r") as f:
+        template = Template(f.read(), resolve_url, path)
+    _template_cache[key] = (_signature([path] + template.dependencies), template)
+    return template
+
+# Finds the closest template.html from the page's directory up to content_dir,
+# falling back to the site-wide default
+def find_template(page_dir, content_dir, default_path):
+    content_dir = os.path.normpath(content_dir)
+    directory = os.path.normpath(page_dir)
+    while True:
+        candidate = os.path.join(directory, TEMPLATE_NAME)
+        if os.path.isfile(candidate):
+            return candidate
+        if directory == content_dir or not directory.startswith(content_dir):
+            return default_path
+        directory = os.path.dirname(directory)
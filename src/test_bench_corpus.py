@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from bench_corpus import CorpusConfig, generate_corpus, page_paths
+from htmlnode import markdown_to_html_node
+from markdown_utils import extract_title
+
+class TestBenchCorpus(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def read_corpus(self, directory):
+        pages = {}
+        for root, _, files in os.walk(os.path.join(directory, "content")):
+            for name in files:
+                with open(os.path.join(root, name)) as f:
+                    pages[os.path.relpath(os.path.join(root, name), directory)] = f.read()
+        return pages
+
+    def test_corpus_is_deterministic(self):
+        config = CorpusConfig(pages=5, blocks=10)
+        generate_corpus(os.path.join(self.tmp, "a"), config)
+        generate_corpus(os.path.join(self.tmp, "b"), config)
+        self.assertEqual(self.read_corpus(os.path.join(self.tmp, "a")), self.read_corpus(os.path.join(self.tmp, "b")))
+
+    def test_corpus_pages_render(self):
+        config = CorpusConfig(pages=10, blocks=30, link_density=1.0, depth=4)
+        self.assertEqual(generate_corpus(self.tmp, config), 10)
+        pages = self.read_corpus(self.tmp)
+        self.assertEqual(len(pages), 10)
+        for markdown in pages.values():
+            extract_title(markdown)
+            markdown_to_html_node(markdown).to_html()
+
+    def test_page_paths_depth(self):
+        paths = page_paths(CorpusConfig(pages=20, depth=2))
+        self.assertEqual(paths[0], "")
+        self.assertEqual(len(set(paths)), 20)
+        self.assertTrue(all(path.count("/") <= 1 for path in paths))
+
+    def test_page_paths_more_than_names(self):
+        # More pages than there are distinct word-number names at depth 1
+        paths = page_paths(CorpusConfig(pages=5000, depth=1))
+        self.assertEqual(len(set(paths)), 5000)
+        self.assertTrue(all("/" not in path for path in paths))
+
+if __name__ == "__main__":
+    unittest.main()
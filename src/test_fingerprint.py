@@ -0,0 +1,116 @@
+import io
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from contextlib import redirect_stdout
+
+import images
+import manifest
+from fingerprint import fingerprint_path, fingerprint_assets, publish_assets
+from test_generate_pages import GeneratePagesTestCase
+from test_images import png_header, fake_resize
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.static_dir = os.path.join(self.tmp, "static")
+        self.public_dir = os.path.join(self.tmp, "public")
+        self.write("index.css", "body {}")
+        self.write("images/a.png", "png")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.static_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_fingerprint_path(self):
+        self.assertEqual(fingerprint_path("css/index.css", "3f2a1b9c0d8e7f"), "css/index.3f2a1b9c0d.css")
+
+    def test_hashes_reused_for_unchanged_files(self):
+        assets, state = fingerprint_assets(self.static_dir)
+        self.assertRegex(assets["/index.css"], r"^/index\.[0-9a-f]{10}\.css$")
+        with mock.patch.object(manifest, "hash_file", wraps=manifest.hash_file) as hash_file:
+            self.assertEqual(fingerprint_assets(self.static_dir, state)[0], assets)
+            self.assertEqual(hash_file.call_count, 0)
+            self.write("index.css", "body { color: red }")
+            changed, state = fingerprint_assets(self.static_dir, state)
+            self.assertEqual(hash_file.call_count, 1)
+        self.assertNotEqual(changed["/index.css"], assets["/index.css"])
+        self.assertEqual(changed["/images/a.png"], assets["/images/a.png"])
+
+    def test_publish_assets(self):
+        assets, state = fingerprint_assets(self.static_dir)
+        with redirect_stdout(io.StringIO()):
+            publish_assets(self.static_dir, self.public_dir, assets)
+        fingerprinted = os.path.join(self.public_dir, assets["/index.css"][1:])
+        with open(fingerprinted) as f:
+            self.assertEqual(f.read(), "body {}")
+        with open(os.path.join(self.public_dir, "asset-manifest.json")) as f:
+            self.assertEqual(json.load(f), assets)
+
+        self.write("index.css", "body { color: red }")
+        changed, state = fingerprint_assets(self.static_dir, state)
+        with redirect_stdout(io.StringIO()) as out:
+            publish_assets(self.static_dir, self.public_dir, changed, assets)
+        self.assertIn("1 placed, 1 removed", out.getvalue())
+        self.assertFalse(os.path.exists(fingerprinted))
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, changed["/index.css"][1:])))
+
+class TestFingerprintedPages(GeneratePagesTestCase):
+    def test_pages_link_to_fingerprinted_assets(self):
+        self.write(self.template_path, '<link href="/index.css">{{ Content }}')
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home\n\n![A](/images/a.png) [B](/blog/b)")
+        assets = {"/index.css": "/index.0123456789.css", "/images/a.png": "/images/a.9876543210.png"}
+        pages = self.build_pages(base_path="/site/", assets=assets)
+        html = self.read("index.html")
+        self.assertIn('<link href="/site/index.0123456789.css">', html)
+        self.assertIn('src="/site/images/a.9876543210.png"', html)
+        self.assertIn('href="/site/blog/b"', html)
+        # Links are recorded by their original URLs, so they are checked against static/
+        self.assertEqual(pages[os.path.join(self.content_dir, "index.md")]["links"], ["/images/a.png", "/blog/b"])
+
+    def test_incremental_asset_change_rebuilds_all(self):
+        self.build(manifest_path=self.manifest_path, assets={"/index.css": "/index.0123456789.css"})
+        log = self.build(manifest_path=self.manifest_path, assets={"/index.css": "/index.0123456789.css"})
+        self.assertIn("0 rendered, 3 unchanged", log)
+        log = self.build(manifest_path=self.manifest_path, assets={"/index.css": "/index.abcdefabcd.css"})
+        self.assertIn("3 rendered, 0 unchanged", log)
+
+    @mock.patch.object(images, "Image", object())
+    @mock.patch.object(images, "_resize", side_effect=fake_resize)
+    def test_resized_images_fingerprinted(self, resize):
+        static_dir = os.path.join(self.tmp, "static")
+        self.write(os.path.join(static_dir, "tom.png"), "")
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home\n\n![Tom](/tom.png)")
+
+        def build_site(image):
+            with open(os.path.join(static_dir, "tom.png"), "wb") as f:
+                f.write(image)
+            with redirect_stdout(io.StringIO()):
+                table = images.process_images(static_dir, self.public_dir, os.path.join(self.tmp, "cache"), (480,))[0]
+                assets = fingerprint_assets(static_dir, images=table)[0]
+                publish_assets(static_dir, self.public_dir, assets)
+            self.build(images=table, assets=assets)
+            return assets
+
+        assets = build_site(png_header(800, 400))
+        resized = assets["/tom-480w.png"]
+        self.assertRegex(resized, r"^/tom-480w\.[0-9a-f]{10}\.png$")
+        self.assertIn(f'srcset="{resized} 480w, {assets["/tom.png"]} 800w"', self.read("index.html"))
+        with open(os.path.join(self.public_dir, resized[1:])) as f:
+            self.assertEqual(f.read(), "tom.png at 480")
+
+        # A new version of the image gets new URLs for its resized versions too
+        assets = build_site(png_header(800, 400) + b"v2")
+        self.assertNotEqual(assets["/tom-480w.png"], resized)
+        self.assertIn(f'srcset="{assets["/tom-480w.png"]} 480w', self.read("index.html"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+import os
+import io
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from generate_pages import find_pages, generate_pages_recursive, generate_pages_pipelined
+from profiler import Profiler
+from links import LinkIndex
+from parse_cache import ParseCache
+from render_cache import RenderCache
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+class GeneratePagesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.tmp, "content")
+        self.public_dir = os.path.join(self.tmp, "public")
+        self.template_path = os.path.join(self.tmp, "template.html")
+        self.manifest_path = os.path.join(self.tmp, ".build", "manifest.json")
+        self.write(self.template_path, TEMPLATE)
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home\n\nWelcome [here](/blog/a)")
+        self.write(os.path.join(self.content_dir, "blog", "a", "index.md"), "# A\n\nFirst post")
+        self.write(os.path.join(self.content_dir, "blog", "b", "index.md"), "# B\n\nSecond post")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, *parts):
+        with open(os.path.join(self.public_dir, *parts)) as f:
+            return f.read()
+
+    def build(self, **kwargs):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir, **kwargs)
+        return out.getvalue()
+
+    # Like build, but returns the site's pages instead of the log
+    def build_pages(self, **kwargs):
+        with redirect_stdout(io.StringIO()):
+            return generate_pages_recursive(self.content_dir, self.template_path, self.public_dir, **kwargs)
+
+class TestFindPages(GeneratePagesTestCase):
+    def test_find_pages_sorted(self):
+        pages = find_pages(self.content_dir, self.public_dir)
+        self.assertEqual(
+            [os.path.relpath(page.source, self.content_dir) for page in pages],
+            ["index.md", "blog/a/index.md", "blog/b/index.md"],
+        )
+        self.assertEqual(pages[1].output, os.path.join(self.public_dir, "blog/a", "index.html"))
+        self.assertEqual([page.url for page in pages], ["/", "/blog/a/", "/blog/b/"])
+        self.assertEqual(pages[1].template, "./template.html")
+
+    def test_find_pages_directory_template(self):
+        blog_template = os.path.join(self.content_dir, "blog", "template.html")
+        self.write(blog_template, "<article>{{ Content }}</article>")
+        pages = find_pages(self.content_dir, self.public_dir, self.template_path)
+        self.assertEqual([page.template for page in pages], [self.template_path, blog_template, blog_template])
+
+class TestGeneratePagesRecursive(GeneratePagesTestCase):
+    def test_full_build(self):
+        self.build(base_path="/site/")
+        html = self.read("index.html")
+        self.assertIn("<title>Home</title>", html)
+        self.assertIn('<a href="/site/blog/a">here</a>', html)
+        self.assertIn("Second post", self.read("blog", "b", "index.html"))
+
+    def test_parallel_build_matches_serial(self):
+        self.build(base_path="/site/")
+        serial = [self.read("index.html"), self.read("blog", "a", "index.html"), self.read("blog", "b", "index.html")]
+        shutil.rmtree(self.public_dir)
+
+        log = self.build(base_path="/site/", jobs=2)
+        parallel = [self.read("index.html"), self.read("blog", "a", "index.html"), self.read("blog", "b", "index.html")]
+        self.assertEqual(serial, parallel)
+        # Per-page results are reported in page order
+        lines = [line for line in log.splitlines() if line.startswith("Generated page")]
+        self.assertEqual(len(lines), 3)
+        self.assertIn(os.path.join("blog", "a"), lines[1])
+        self.assertIn(os.path.join("blog", "b"), lines[2])
+
+    def test_parse_cache_build_matches_plain(self):
+        self.build(base_path="/site/")
+        plain = [self.read("index.html"), self.read("blog", "a", "index.html")]
+        cache = ParseCache(os.path.join(self.tmp, "parse_cache"))
+        for jobs in (1, 2, 1):
+            shutil.rmtree(self.public_dir)
+            pages = self.build_pages(base_path="/site/", jobs=jobs, parse_cache=cache)
+            self.assertEqual([self.read("index.html"), self.read("blog", "a", "index.html")], plain)
+            self.assertEqual(pages[os.path.join(self.content_dir, "index.md")]["links"], ["/blog/a"])
+        # The first build parsed every page; the other two reused them
+        self.assertEqual((cache.hits, cache.misses), (6, 3))
+
+    def test_parse_error_keeps_previous_output(self):
+        self.build()
+        before = self.read("blog", "a", "index.html")
+        self.write(os.path.join(self.content_dir, "blog", "a", "index.md"), "# A\n\nFirst\n\nHalf **typed")
+        with self.assertRaises(ValueError):
+            self.build()
+        self.assertEqual(self.read("blog", "a", "index.html"), before)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.public_dir, "blog", "a"))), ["index.html"])
+
+    def test_parallel_build_fills_render_cache(self):
+        path = os.path.join(self.tmp, "render_cache.json")
+        cache = RenderCache(path=path)
+        self.build(jobs=2, cache=cache)
+        # Every block the workers rendered reached the parent's cache, and so the saved file
+        self.assertEqual((cache.hits, cache.misses), (0, 6))
+        self.assertEqual(len(cache.entries), 6)
+        cache.save()
+        self.assertEqual(len(RenderCache(path=path).entries), 6)
+
+    def test_pipelined_build_matches_serial(self):
+        for i in range(10):
+            self.write(os.path.join(self.content_dir, "more", str(i), "index.md"), f"# Page {i}\n\nBody {i}")
+        self.build(base_path="/site/")
+        pages = find_pages(self.content_dir, self.public_dir, self.template_path)
+        serial = [self.read(os.path.relpath(page.output, self.public_dir)) for page in pages]
+        shutil.rmtree(self.public_dir)
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            generate_pages_pipelined(pages, "/site/", readers=2, writers=2, depth=2)
+        self.assertEqual([self.read(os.path.relpath(page.output, self.public_dir)) for page in pages], serial)
+        logged = [line.split()[3] for line in out.getvalue().splitlines()]
+        self.assertEqual(logged, [page.source for page in pages])
+
+    def test_profiled_build_matches_plain(self):
+        self.build(base_path="/site/")
+        plain = self.read("blog", "a", "index.html")
+        profiler = Profiler()
+        self.build(base_path="/site/", profiler=profiler)
+        self.assertEqual(self.read("blog", "a", "index.html"), plain)
+        self.assertEqual(len(profiler.pages), 3)
+        self.assertEqual(profiler.pages[1]["size"], len(plain))
+        self.assertEqual(set(profiler.page_stages), {"read", "blocks", "inline", "to_html", "template", "write"})
+        self.assertIn("render", profiler.stages)
+
+    def test_incremental_skips_unchanged(self):
+        log = self.build(manifest_path=self.manifest_path)
+        self.assertIn("3 rendered, 0 unchanged", log)
+
+        log = self.build(manifest_path=self.manifest_path)
+        self.assertIn("0 rendered, 3 unchanged", log)
+        self.assertNotIn("Generating page", log)
+
+    def test_incremental_renders_changed_source(self):
+        self.build(manifest_path=self.manifest_path)
+        self.write(os.path.join(self.content_dir, "blog", "a", "index.md"), "# A\n\nEdited post")
+
+        log = self.build(manifest_path=self.manifest_path)
+        self.assertIn("1 rendered, 2 unchanged", log)
+        self.assertIn("blog/a/index.md", log)
+        self.assertIn("Edited post", self.read("blog", "a", "index.html"))
+
+    def test_incremental_template_change_rebuilds_all(self):
+        self.build(manifest_path=self.manifest_path)
+        self.write(self.template_path, TEMPLATE.replace("<body>", "<body class=\"new\">"))
+
+        log = self.build(manifest_path=self.manifest_path)
+        self.assertIn("3 rendered, 0 unchanged", log)
+
+    def test_template_variables(self):
+        self.write(self.template_path, '<meta content="{{ Description }}">{{Path}} {{ Date }} {{ Unknown }}')
+        self.build(base_path="/site/")
+        html = self.read("blog", "a", "index.html")
+        self.assertRegex(html, r'^<meta content="First post">/site/blog/a/ \d{4}-\d{2}-\d{2} \{\{ Unknown \}\}$')
+
+    def test_template_with_repeated_content(self):
+        self.write(self.template_path, "<main>{{ Content }}</main><noscript>{{ Content }}</noscript>")
+        self.build()
+        html = "<div><h1>A</h1><p>First post</p></div>"
+        self.assertEqual(self.read("blog", "a", "index.html"), f"<main>{html}</main><noscript>{html}</noscript>")
+
+    def test_directory_template_change_rebuilds_dependents(self):
+        self.write(os.path.join(self.content_dir, "blog", "template.html"), "<main>{{ Content }}</main>")
+        self.build(manifest_path=self.manifest_path)
+        self.assertTrue(self.read("blog", "a", "index.html").startswith("<main>"))
+
+        self.write(os.path.join(self.content_dir, "blog", "template.html"), "<section>{{ Content }}</section>")
+        log = self.build(manifest_path=self.manifest_path)
+        self.assertIn("2 rendered, 1 unchanged", log)
+        self.assertTrue(self.read("blog", "b", "index.html").startswith("<section>"))
+
+    def test_partial_change_rebuilds_only_dependents(self):
+        self.write(os.path.join(self.content_dir, "blog", "template.html"), "<main>{{ Content }}{{> footer.html }}</main>")
+        self.write(os.path.join(self.content_dir, "blog", "footer.html"), "<footer>v1</footer>")
+        self.build(manifest_path=self.manifest_path)
+        home = os.stat(os.path.join(self.public_dir, "index.html")).st_mtime_ns
+
+        self.write(os.path.join(self.content_dir, "blog", "footer.html"), "<footer>v2</footer>")
+        log = self.build(manifest_path=self.manifest_path)
+        self.assertIn("2 rendered, 1 unchanged", log)
+        self.assertNotIn(os.path.join(self.content_dir, "index.md"), log)
+        self.assertIn("<footer>v2</footer>", self.read("blog", "a", "index.html"))
+        self.assertEqual(os.stat(os.path.join(self.public_dir, "index.html")).st_mtime_ns, home)
+
+    def test_incremental_base_path_change_rebuilds_all(self):
+        self.build(manifest_path=self.manifest_path)
+        log = self.build(manifest_path=self.manifest_path, base_path="/site/")
+        self.assertIn("3 rendered, 0 unchanged", log)
+
+    def test_incremental_removes_deleted_pages(self):
+        self.build(manifest_path=self.manifest_path)
+        shutil.rmtree(os.path.join(self.content_dir, "blog", "b"))
+
+        log = self.build(manifest_path=self.manifest_path)
+        self.assertIn("0 rendered, 2 unchanged, 1 removed", log)
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "blog", "b")))
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, "blog", "a", "index.html")))
+
+    def test_link_index(self):
+        self.write(os.path.join(self.content_dir, "blog", "b", "index.md"), "# B\n\n[Home](/) ![x](/img/x.png) [gone](/blog/c#top) [ext](https://example.com)")
+        links = LinkIndex(self.build_pages(base_path="/site/"))
+        self.assertEqual(links.targets["/blog/a"], [os.path.join(self.content_dir, "index.md")])
+        source = os.path.join(self.content_dir, "blog", "b", "index.md")
+        self.assertEqual(links.pages[source]["links"], ["/", "/img/x.png", "/blog/c#top"])
+        self.assertEqual(links.broken(), [(source, "/blog/c#top"), (source, "/img/x.png")])
+        self.assertEqual(links.broken(["img/x.png"]), [(source, "/blog/c#top")])
+
+    def test_incremental_keeps_page_info(self):
+        full = self.build_pages(manifest_path=self.manifest_path)
+        self.assertEqual(full[os.path.join(self.content_dir, "blog", "a", "index.md")]["terms"], {"first": 1, "post": 1})
+        self.write(os.path.join(self.content_dir, "blog", "b", "index.md"), "# B\n\nSecond edited post")
+        pages = self.build_pages(manifest_path=self.manifest_path)
+        self.assertEqual(pages[os.path.join(self.content_dir, "blog", "b", "index.md")]["terms"], {"second": 1, "edited": 1, "post": 1})
+        self.assertEqual(pages[os.path.join(self.content_dir, "index.md")], full[os.path.join(self.content_dir, "index.md")])
+
+    def test_incremental_link_index(self):
+        self.build(manifest_path=self.manifest_path)
+        shutil.rmtree(os.path.join(self.content_dir, "blog", "a"))
+        log = self.build(manifest_path=self.manifest_path)
+        self.assertIn("0 rendered, 2 unchanged, 1 removed", log)
+        # The home page was not re-rendered, but its recorded link now points at a deleted page
+        links = LinkIndex(self.build_pages(manifest_path=self.manifest_path))
+        self.assertEqual(links.broken(), [(os.path.join(self.content_dir, "index.md"), "/blog/a")])
+
+    def test_incremental_restores_missing_output(self):
+        self.build(manifest_path=self.manifest_path)
+        os.remove(os.path.join(self.public_dir, "index.html"))
+
+        log = self.build(manifest_path=self.manifest_path)
+        self.assertIn("1 rendered, 2 unchanged", log)
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, "index.html")))
+
+if __name__ == "__main__":
+    unittest.main()
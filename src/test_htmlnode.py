@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HtmlNode, LeafNode, ParentNode, text_node_to_html_node, markdown_to_html_node
+from htmlnode import HtmlNode, LeafNode, ParentNode, HtmlStream, text_node_to_html_node, text_to_children, markdown_to_html_node, markdown_to_html_iter
 from textnode import TextNode, TextType
 
 class TestHtmlNode(unittest.TestCase):
@@ -32,6 +33,12 @@ class TestHtmlNode(unittest.TestCase):
         expected = 'HtmlNode(tag=div, value=content, children=[\'child\'], props={\'class\': \'text\'})'
         self.assertEqual(repr(node), expected)
 
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HtmlNode(), LeafNode("b", "x"), ParentNode("p", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.extra = 1
+
     def test_to_html_not_implemented(self):
         node = HtmlNode()
         with self.assertRaises(NotImplementedError):
@@ -123,6 +130,25 @@ class TestParentNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             node.to_html()
 
+    def test_write_html_matches_to_html(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "Hello "), LeafNode("b", "world")]),
+            LeafNode("a", "link", {"href": "/about"}),
+        ], {"class": "page"})
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+        self.assertEqual(
+            buffer.getvalue(),
+            '<div class="page"><p>Hello <b>world</b></p><a href="/about">link</a></div>'
+        )
+
+    def test_write_html_with_none_children(self):
+        node = ParentNode("div", [LeafNode("p", "Child")])
+        node.children = None
+        with self.assertRaises(ValueError):
+            node.write_html(io.StringIO())
+
 class TestTextNodeToHtmlNode(unittest.TestCase):
     def test_text_node_to_html_node_text(self):
         text_node = TextNode("Hello world", TextType.TEXT)
@@ -168,6 +194,20 @@ class TestTextNodeToHtmlNode(unittest.TestCase):
         self.assertEqual(html_node.tag, "img")
         self.assertEqual(html_node.props, {"src": "https://www.example.com/image.jpg", "alt": "Image alt"})
 
+    def test_text_node_to_html_node_resolve_url(self):
+        resolve_url = lambda url: "/site" + url
+        link = text_node_to_html_node(TextNode("Link", TextType.LINK, "/about"), resolve_url)
+        image = text_node_to_html_node(TextNode("Alt", TextType.IMAGE, "/a.png"), resolve_url)
+        self.assertEqual(link.props, {"href": "/site/about"})
+        self.assertEqual(image.props, {"src": "/site/a.png", "alt": "Alt"})
+
+    def test_text_to_children_plain_text(self):
+        children = text_to_children("Plain prose with no markup.")
+        self.assertEqual(len(children), 1)
+        self.assertIsNone(children[0].tag)
+        self.assertEqual(children[0].value, "Plain prose with no markup.")
+        self.assertEqual(text_to_children(""), [])
+
 class TestMarkdownToHtmlNode(unittest.TestCase):
     def test_markdown_to_html_node_paragraph(self):
         markdown = "This is a paragraph of text."
@@ -195,6 +235,13 @@ class TestMarkdownToHtmlNode(unittest.TestCase):
         self.assertEqual(node.children[0].children[0].tag, "code")
         self.assertEqual(node.children[0].children[0].value, "code block")
 
+    def test_markdown_to_html_node_code_with_blank_lines(self):
+        markdown = "```\nfirst\n\nsecond\n```\n\nAfter"
+        node = markdown_to_html_node(markdown)
+        self.assertEqual(len(node.children), 2)
+        self.assertEqual(node.children[0].children[0].value, "first\n\nsecond")
+        self.assertEqual(node.children[1].tag, "p")
+
     def test_markdown_to_html_node_quote(self):
         markdown = "> This is a quote"
         node = markdown_to_html_node(markdown)
@@ -233,6 +280,38 @@ Paragraph 2
         self.assertEqual(node.children[2].tag, "blockquote")
         self.assertEqual(node.children[3].tag, "p")
 
+    def test_markdown_to_html_node_resolve_url(self):
+        markdown = "See [home](/) and ![pic](/a.png), not `href=\"/code\"`"
+        html = markdown_to_html_node(markdown, lambda url: "/site" + url).to_html()
+        self.assertEqual(
+            html,
+            '<div><p>See <a href="/site/">home</a> and <img src="/site/a.png" alt="pic"></img>, not <code>href="/code"</code></p></div>'
+        )
+
+class TestMarkdownToHtmlIter(unittest.TestCase):
+    def test_chunks_match_tree(self):
+        markdown = "# Title\n\nSome **bold** [link](/a)\n\n```\ncode\n```\n\n> quote"
+        chunks = list(markdown_to_html_iter(markdown))
+        self.assertEqual(chunks[0], "<div>")
+        self.assertEqual(chunks[-1], "</div>")
+        self.assertEqual(len(chunks), 6)
+        self.assertEqual("".join(chunks), markdown_to_html_node(markdown).to_html())
+
+    def test_blocks_parsed_lazily(self):
+        texts = []
+        chunks = markdown_to_html_iter("First\n\nSecond", on_text=texts.append)
+        next(chunks)
+        self.assertEqual(next(chunks), "<p>First</p>")
+        self.assertEqual(texts, ["First"])
+
+    def test_stream_written_once(self):
+        stream = HtmlStream(markdown_to_html_iter("Hello"))
+        buffer = io.StringIO()
+        stream.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<div><p>Hello</p></div>")
+        with self.assertRaises(ValueError):
+            stream.to_html()
+
         
 if __name__ == "__main__":
     unittest.main()
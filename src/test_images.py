@@ -0,0 +1,100 @@
+import io
+import os
+import struct
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from contextlib import redirect_stdout
+
+import images
+from images import image_size, image_table, image_props, derivative_path, process_images
+from htmlnode import text_node_to_html_node, markdown_to_html_node
+from textnode import TextNode, TextType
+
+def png_header(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+def jpeg_header(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    sof0 = b"\xff\xc0" + struct.pack(">HBHH", 11, 8, height, width) + bytes(3)
+    return b"\xff\xd8" + app0 + sof0
+
+# Stands in for the Pillow resize: writes the job's width so tests can see what was produced
+def fake_resize(job):
+    src, dst, width = job
+    with open(dst, "w") as f:
+        f.write(f"{os.path.basename(src)} at {width}")
+
+class TestImages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.static_dir = os.path.join(self.tmp, "static")
+        self.public_dir = os.path.join(self.tmp, "public")
+        self.cache_dir = os.path.join(self.tmp, "cache")
+        self.write("images/wide.png", png_header(2000, 1000))
+        self.write("photo.jpg", jpeg_header(640, 480))
+        self.write("notes.txt", b"not an image")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, rel_path, data):
+        path = os.path.join(self.static_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def test_image_size(self):
+        self.assertEqual(image_size(os.path.join(self.static_dir, "images", "wide.png")), (2000, 1000))
+        self.assertEqual(image_size(os.path.join(self.static_dir, "photo.jpg")), (640, 480))
+        self.assertIsNone(image_size(os.path.join(self.static_dir, "notes.txt")))
+
+    def test_derivative_path(self):
+        self.assertEqual(derivative_path("images/tom.png", 480), "images/tom-480w.png")
+
+    @mock.patch.object(images, "Image", None)
+    def test_table_without_pillow(self):
+        table = image_table(self.static_dir)
+        self.assertEqual(table, {
+            "/images/wide.png": {"width": 2000, "height": 1000, "srcset": []},
+            "/photo.jpg": {"width": 640, "height": 480, "srcset": []},
+        })
+        node = text_node_to_html_node(TextNode("Wide", TextType.IMAGE, "/images/wide.png"), images=table)
+        self.assertEqual(node.to_html(), '<img src="/images/wide.png" alt="Wide" width="2000" height="1000"></img>')
+
+    @mock.patch.object(images, "Image", object())
+    def test_srcset(self):
+        table = image_table(self.static_dir, widths=(480, 960))
+        self.assertEqual(table["/photo.jpg"]["srcset"], [["/photo-480w.jpg", 480], ["/photo.jpg", 640]])
+        props = image_props(table["/photo.jpg"], lambda url: "/site" + url)
+        self.assertEqual(props["srcset"], "/site/photo-480w.jpg 480w, /site/photo.jpg 640w")
+        html = markdown_to_html_node("![Photo](/photo.jpg) ![Other](/other.png)", images=table).to_html()
+        self.assertIn('srcset="/photo-480w.jpg 480w, /photo.jpg 640w"', html)
+        self.assertIn('<img src="/other.png" alt="Other"></img>', html)
+
+    @mock.patch.object(images, "Image", object())
+    @mock.patch.object(images, "_resize", side_effect=fake_resize)
+    def test_derivatives_cached(self, resize):
+        with redirect_stdout(io.StringIO()):
+            table, state = process_images(self.static_dir, self.public_dir, self.cache_dir, (480, 960))
+        self.assertEqual(resize.call_count, 3)
+        self.assertEqual(sorted(state["derivatives"]), ["images/wide-480w.png", "images/wide-960w.png", "photo-480w.jpg"])
+        with open(os.path.join(self.public_dir, "images", "wide-960w.png")) as f:
+            self.assertEqual(f.read(), "wide.png at 960")
+
+        # Unchanged images come from the cache, even into an empty public directory
+        shutil.rmtree(self.public_dir)
+        with redirect_stdout(io.StringIO()):
+            table, state = process_images(self.static_dir, self.public_dir, self.cache_dir, (480, 960), manifest=state)
+        self.assertEqual(resize.call_count, 3)
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, "photo-480w.jpg")))
+
+        # A removed image takes its resized versions with it
+        os.remove(os.path.join(self.static_dir, "photo.jpg"))
+        with redirect_stdout(io.StringIO()):
+            process_images(self.static_dir, self.public_dir, self.cache_dir, (480, 960), manifest=state)
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "photo-480w.jpg")))
+
+if __name__ == "__main__":
+    unittest.main()
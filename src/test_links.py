@@ -0,0 +1,43 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from links import LinkIndex, link_target, recording_resolver, site_links
+
+class TestLinks(unittest.TestCase):
+    def test_recording_resolver(self):
+        urls = []
+        resolve_url = recording_resolver(lambda url: "/site" + url, urls)
+        self.assertEqual(resolve_url("/a"), "/site/a")
+        self.assertEqual(recording_resolver(None, urls)("b"), "b")
+        self.assertEqual(urls, ["/a", "b"])
+
+    def test_site_links(self):
+        self.assertEqual(site_links(["/a", "https://x.com", "//cdn", "/a", "rel", "/b"]), ["/a", "/b"])
+
+    def test_link_target(self):
+        self.assertEqual(link_target("/blog/tom/"), "/blog/tom")
+        self.assertEqual(link_target("/blog/tom#intro"), "/blog/tom")
+        self.assertEqual(link_target("/blog/tom/index.html?x=1"), "/blog/tom")
+        self.assertEqual(link_target("/images/a%20b.png"), "/images/a b.png")
+        self.assertEqual(link_target("/index.html"), "/")
+
+    def test_broken_and_report(self):
+        index = LinkIndex({
+            "content/index.md": {"url": "/", "links": ["/blog/a/", "/missing", "/images/a.png"]},
+            "content/blog/a/index.md": {"url": "/blog/a/", "links": ["/", "/images/b.png"]},
+        })
+        self.assertEqual(index.targets["/"], ["content/blog/a/index.md"])
+        self.assertEqual(index.broken(["images/a.png"]), [
+            ("content/blog/a/index.md", "/images/b.png"),
+            ("content/index.md", "/missing"),
+        ])
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(index.report(["images/a.png"]), 2)
+        self.assertIn("Broken link in content/index.md: /missing (no such page)", out.getvalue())
+        self.assertIn("/images/b.png (no such file)", out.getvalue())
+        self.assertIn("5 internal links to 5 URLs, 2 broken", out.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
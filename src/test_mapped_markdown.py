@@ -0,0 +1,113 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from contextlib import redirect_stdout
+
+import generate_pages
+from generate_pages import Page, render_page, generate_pages_pipelined
+from mapped_markdown import MappedMarkdown, iter_mapped_lines, open_markdown
+from markdown_utils import extract_title
+from htmlnode import markdown_to_html_node
+from parse_cache import ParseCache
+
+MARKDOWN = "Intro paragraph\n\n# Título\r\n\n```\ncode\n\nmore\n```\n\n- one\n- two\n"
+
+class TestMappedMarkdown(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "index.md")
+        with open(self.path, "w", newline="") as f:
+            f.write(MARKDOWN)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_iter_mapped_lines(self):
+        self.assertEqual(list(iter_mapped_lines(b"a\nb\n")), ["a", "b", ""])
+        self.assertEqual(list(iter_mapped_lines("é\nx".encode())), ["é", "x"])
+
+    def test_matches_string_parsing(self):
+        with MappedMarkdown(self.path) as markdown:
+            self.assertEqual(extract_title(markdown), "Título")
+            self.assertEqual(markdown_to_html_node(markdown).to_html(), markdown_to_html_node(MARKDOWN).to_html())
+            # Iterating again starts from the top of the file
+            self.assertEqual(next(iter(markdown)), "Intro paragraph")
+
+    def test_open_markdown_threshold(self):
+        with open_markdown(self.path) as markdown:
+            self.assertEqual(markdown, MARKDOWN.replace("\r\n", "\n"))
+        with open_markdown(self.path, threshold=1) as markdown:
+            self.assertIsInstance(markdown, MappedMarkdown)
+
+    def test_render_page_mapped(self):
+        template_path = os.path.join(self.tmp, "template.html")
+        with open(template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        page = Page(self.path, os.path.join(self.tmp, "public", "index.html"), template_path, "/")
+        render_page(page)
+        with open(page.output) as f:
+            expected = f.read()
+        with mock.patch.object(generate_pages, "open_markdown", lambda path: open_markdown(path, threshold=1)):
+            render_page(page)
+            with open(page.output) as f:
+                self.assertEqual(f.read(), expected)
+            timings = {}
+            render_page(page, timings=timings)
+            with open(page.output) as f:
+                self.assertEqual(f.read(), expected)
+
+    def test_pipelined_mapped(self):
+        template_path = os.path.join(self.tmp, "template.html")
+        with open(template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        small_path = os.path.join(self.tmp, "small.md")
+        with open(small_path, "w") as f:
+            f.write("# Small\n\nx")
+        pages = [
+            Page(self.path, os.path.join(self.tmp, "public", "index.html"), template_path, "/"),
+            Page(small_path, os.path.join(self.tmp, "public", "small", "index.html"), template_path, "/small/"),
+        ]
+        log = io.StringIO()
+        with redirect_stdout(log):
+            expected = generate_pages_pipelined(pages)
+        outputs = []
+        for page in pages:
+            with open(page.output) as f:
+                outputs.append(f.read())
+        opened = []
+
+        def open_small_mapped(path):
+            source = open_markdown(path, threshold=len("# Small\n\nx") + 1)
+            opened.append(type(source))
+            return source
+        with mock.patch.object(generate_pages, "open_markdown", open_small_mapped), redirect_stdout(io.StringIO()) as mapped_log:
+            self.assertEqual(generate_pages_pipelined(pages), expected)
+        self.assertIn(MappedMarkdown, opened)
+        for page, output in zip(pages, outputs):
+            with open(page.output) as f:
+                self.assertEqual(f.read(), output)
+        self.assertEqual(mapped_log.getvalue(), log.getvalue())
+
+    def test_parse_cache_bypassed_for_mapped(self):
+        template_path = os.path.join(self.tmp, "template.html")
+        with open(template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        page = Page(self.path, os.path.join(self.tmp, "public", "index.html"), template_path, "/")
+        render_page(page)
+        with open(page.output) as f:
+            expected = f.read()
+        cache = ParseCache(os.path.join(self.tmp, "parse_cache"))
+        with mock.patch.object(generate_pages, "open_markdown", lambda path: open_markdown(path, threshold=1)):
+            render_page(page, parse_cache=cache)
+            render_page(page, timings={}, parse_cache=cache)
+            with open(page.output) as f:
+                self.assertEqual(f.read(), expected)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+        self.assertFalse(os.path.exists(cache.directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
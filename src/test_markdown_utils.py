@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from markdown_utils import extract_markdown_images, extract_markdown_links, markdown_to_blocks, block_to_block_type, BlockType, extract_title
+from markdown_utils import extract_markdown_images, extract_markdown_links, markdown_to_blocks, block_to_block_type, BlockType, extract_title, iter_blocks, iter_lines
 
 class TestMarkdownExtraction(unittest.TestCase):
     def test_extract_markdown_images(self):
@@ -120,6 +121,51 @@ Final paragraph"""
             ]
         )
 
+    def test_markdown_to_blocks_fenced_code_with_blank_lines(self):
+        md = """Intro
+
+```
+first line
+
+second line
+```
+After the fence"""
+        self.assertEqual(
+            list(iter_blocks(md)),
+            [
+                ("Intro", BlockType.PARAGRAPH),
+                ("```\nfirst line\n\nsecond line\n```", BlockType.CODE),
+                ("After the fence", BlockType.PARAGRAPH),
+            ]
+        )
+
+    def test_iter_blocks_types(self):
+        md = "# Title\n\n> quote\n\n- a\n- b\n\n1. one\n\n```inline```\n\ntext"
+        self.assertEqual(
+            [block_type for _, block_type in iter_blocks(md)],
+            [BlockType.HEADING, BlockType.QUOTE, BlockType.UNORDERED_LIST,
+             BlockType.ORDERED_LIST, BlockType.CODE, BlockType.PARAGRAPH]
+        )
+
+    def test_iter_blocks_crlf_and_whitespace_lines(self):
+        md = "First\r\nline\r\n\r\nSecond\n   \nThird"
+        self.assertEqual(markdown_to_blocks(md), ["First\nline", "Second", "Third"])
+
+    def test_iter_blocks_from_lines(self):
+        source = io.StringIO("# Title\n\nBody text\nmore\n")
+        self.assertEqual(
+            list(iter_blocks(source)),
+            [("# Title", BlockType.HEADING), ("Body text\nmore", BlockType.PARAGRAPH)]
+        )
+
+    def test_iter_blocks_is_lazy(self):
+        blocks = iter_blocks("one\n\ntwo")
+        self.assertEqual(next(blocks), ("one", BlockType.PARAGRAPH))
+
+    def test_iter_lines(self):
+        self.assertEqual(list(iter_lines("a\nb\n")), ["a", "b", ""])
+        self.assertEqual(list(iter_lines("")), [""])
+
     def test_block_to_block_type(self):
         # Basic tests
         self.assertEqual(block_to_block_type(""), BlockType.PARAGRAPH)
@@ -0,0 +1,34 @@
+import unittest
+
+from minify import minify_html
+
+class TestMinify(unittest.TestCase):
+    def test_whitespace_between_block_tags_removed(self):
+        html = "<!doctype html>\n<html>\n  <head>\n    <title>Hi</title>\n  </head>\n  <body>\n    <p>One\n   two</p>\n  </body>\n</html>\n"
+        self.assertEqual(minify_html(html), "<!doctype html><html><head><title>Hi</title></head><body><p>One two</p></body></html>")
+
+    def test_space_between_inline_tags_kept(self):
+        self.assertEqual(minify_html("<p><b>bold</b>\n  <i>italic</i></p>"), "<p><b>bold</b> <i>italic</i></p>")
+
+    def test_pre_and_code_untouched(self):
+        html = "<div>\n  <pre><code>def f():\n    return 1\n</code></pre>\n  <p>Use <code>a  =  b</code>  here</p>\n</div>"
+        self.assertEqual(
+            minify_html(html),
+            "<div><pre><code>def f():\n    return 1\n</code></pre><p>Use <code>a  =  b</code> here</p></div>",
+        )
+
+    def test_comments_removed(self):
+        self.assertEqual(minify_html("<p>a<!-- note\n -->b</p>"), "<p>ab</p>")
+        self.assertEqual(minify_html("<!--[if IE]><p>old</p><![endif]-->"), "<!--[if IE]><p>old</p><![endif]-->")
+
+    def test_script_untouched(self):
+        html = "<body>\n<script>\n  let a = '<p>  x  </p>';\n</script>\n</body>"
+        self.assertEqual(minify_html(html), "<body><script>\n  let a = '<p>  x  </p>';\n</script></body>")
+
+    def test_attribute_values_untouched(self):
+        html = '<div title="a  >  b">\n  <img alt="two  spaces" src="x.png">  <p>Hi</p>\n</div>'
+        self.assertEqual(minify_html(html), '<div title="a  >  b"><img alt="two  spaces" src="x.png"><p>Hi</p></div>')
+        self.assertEqual(minify_html("<meta content='a\n  b'>\n<p>x</p>"), "<meta content='a\n  b'><p>x</p>")
+
+if __name__ == "__main__":
+    unittest.main()
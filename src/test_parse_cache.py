@@ -0,0 +1,145 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import parse_cache
+from htmlnode import ParentNode, markdown_to_html_node
+from parse_cache import ParseCache, parse_markdown, document_to_html_nodes, HEADER, MAGIC
+
+MARKDOWN = """# Title
+
+Plain paragraph
+
+Some **bold** and _italic_ with a [link](/about) and ![pic](/a.png)
+
+```
+code **not parsed**
+```
+
+> a quote
+
+- one
+- two `code`
+
+1. first
+2. second
+"""
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.directory = os.path.join(self.tmp, "parse_cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def render(self, document, **kwargs):
+        return ParentNode("div", list(document_to_html_nodes(document, **kwargs))).to_html()
+
+    def test_same_html_as_parser(self):
+        images = {"/a.png": {"width": 10, "height": 5, "srcset": []}}
+        resolve_url = lambda url: "/site" + url
+        texts = []
+        expected_texts = []
+        self.assertEqual(
+            self.render(parse_markdown(MARKDOWN), resolve_url=resolve_url, on_text=texts.append, images=images),
+            markdown_to_html_node(MARKDOWN, resolve_url, on_text=expected_texts.append, images=images).to_html(),
+        )
+        self.assertEqual(texts, expected_texts)
+
+    def test_plain_text_stored_as_string(self):
+        document = parse_markdown("Plain paragraph\n\nWith **bold**")
+        self.assertEqual(document, [("p", ["Plain paragraph"]), ("p", [[("text", "With ", None), ("bold", "bold", None)]])])
+
+    def test_reused_across_instances(self):
+        ParseCache(self.directory).parse(MARKDOWN)
+        cache = ParseCache(self.directory)
+        with mock.patch.object(parse_cache, "parse_markdown") as parse:
+            document = cache.parse(MARKDOWN)
+        parse.assert_not_called()
+        self.assertEqual(document, parse_markdown(MARKDOWN))
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_entry_format(self):
+        cache = ParseCache(self.directory)
+        cache.parse(MARKDOWN)
+        with open(cache.path(cache.key(MARKDOWN)), "rb") as f:
+            data = f.read()
+        magic, version, length = HEADER.unpack_from(data)
+        self.assertEqual((magic, version, length), (MAGIC, parse_cache.PARSE_CACHE_VERSION, len(data) - HEADER.size))
+
+    def test_version_change_misses(self):
+        ParseCache(self.directory).parse(MARKDOWN)
+        with mock.patch.object(parse_cache, "PARSE_CACHE_VERSION", parse_cache.PARSE_CACHE_VERSION + 1):
+            cache = ParseCache(self.directory)
+            cache.parse(MARKDOWN)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_corrupt_entry_misses(self):
+        cache = ParseCache(self.directory)
+        cache.parse(MARKDOWN)
+        with open(cache.path(cache.key(MARKDOWN)), "r+b") as f:
+            f.truncate(HEADER.size + 3)
+        self.assertEqual(cache.parse(MARKDOWN), parse_markdown(MARKDOWN))
+        self.assertEqual(cache.misses, 2)
+        self.assertIsNotNone(cache.get(cache.key(MARKDOWN)))
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = ParseCache(self.directory)
+        sources = [f"# Page {i}\n\n" + "word " * 200 for i in range(3)]
+        for i, source in enumerate(sources):
+            cache.parse(source)
+            # Entries are ordered by mtime, so space them out
+            os.utime(cache.path(cache.key(source)), ns=(i * 10**9, i * 10**9))
+        cache.parse(sources[0])
+        size = os.path.getsize(cache.path(cache.key(sources[0])))
+        cache.max_bytes = 2 * size
+        cache.prune()
+        self.assertEqual(cache.evicted, 1)
+        self.assertEqual(cache.stored, (2, 2 * size))
+        self.assertFalse(os.path.exists(cache.path(cache.key(sources[1]))))
+        self.assertTrue(os.path.exists(cache.path(cache.key(sources[0]))))
+
+    def test_prune_keeps_tmp_of_concurrent_writer(self):
+        writer = ParseCache(self.directory)
+        other = ParseCache(self.directory)
+        replace = os.replace
+
+        def prune_then_replace(src, dst):
+            other.prune()
+            replace(src, dst)
+        with mock.patch.object(parse_cache.os, "replace", side_effect=prune_then_replace):
+            writer.parse(MARKDOWN)
+        self.assertIsNotNone(other.get(writer.key(MARKDOWN)))
+
+    def test_prune_removes_stale_tmp(self):
+        os.makedirs(self.directory)
+        tmp_path = os.path.join(self.directory, "abc.bin.123.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(b"partial")
+        cache = ParseCache(self.directory)
+        cache.prune()
+        self.assertTrue(os.path.exists(tmp_path))
+        old = time.time() - parse_cache.STALE_TMP_SECONDS - 1
+        os.utime(tmp_path, (old, old))
+        cache.prune()
+        self.assertFalse(os.path.exists(tmp_path))
+
+    def test_prune_tolerates_entries_removed_meanwhile(self):
+        cache = ParseCache(self.directory, max_bytes=0)
+        cache.parse(MARKDOWN)
+        with mock.patch.object(parse_cache.os, "remove", side_effect=FileNotFoundError):
+            cache.prune()
+        self.assertEqual((cache.evicted, cache.stored), (0, (0, 0)))
+
+    def test_summary_before_prune(self):
+        cache = ParseCache(self.directory)
+        cache.parse(MARKDOWN)
+        self.assertEqual(cache.summary(), "Parse cache: 0 hits, 1 misses (0% hit rate)")
+
+
+if __name__ == "__main__":
+    unittest.main()
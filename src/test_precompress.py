@@ -0,0 +1,72 @@
+import io
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from contextlib import redirect_stdout
+
+import precompress
+from precompress import process_outputs
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.write("index.html", "<html>\n  <body>\n    <p>Hi</p>\n  </body>\n</html>\n")
+        self.write("blog/index.html", "<p>Post</p>\n")
+        self.write("index.css", "body {}\n")
+        self.write("page.html", "<p>\n  static\n</p>\n")
+        self.write("images/a.png", "png")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def path(self, rel_path):
+        return os.path.join(self.tmp, rel_path)
+
+    def write(self, rel_path, text):
+        os.makedirs(os.path.dirname(self.path(rel_path)), exist_ok=True)
+        with open(self.path(rel_path), "w") as f:
+            f.write(text)
+
+    def read(self, rel_path):
+        with open(self.path(rel_path), "rb") as f:
+            return f.read()
+
+    def process(self, state=None, **kwargs):
+        with redirect_stdout(io.StringIO()), mock.patch.object(precompress, "brotli", None):
+            return process_outputs(self.tmp, ["page.html", "index.css", "images/a.png"], state=state, **kwargs)
+
+    def test_minifies_pages_and_writes_siblings(self):
+        state = self.process()
+        self.assertEqual(self.read("index.html"), b"<html><body><p>Hi</p></body></html>")
+        self.assertEqual(self.read("page.html"), b"<p>\n  static\n</p>\n")
+        self.assertEqual(gzip.decompress(self.read("index.html.gz")), self.read("index.html"))
+        self.assertEqual(gzip.decompress(self.read("index.css.gz")), b"body {}\n")
+        self.assertFalse(os.path.exists(self.path("images/a.png.gz")))
+        self.assertEqual(sorted(state["files"]), ["blog/index.html", "index.css", "index.html", "page.html"])
+
+    def test_unchanged_outputs_skipped(self):
+        state = self.process()
+        self.write("blog/index.html", "<p>Edited</p>\n")
+        with mock.patch.object(precompress, "_process", wraps=precompress._process) as process:
+            self.process(state)
+        self.assertEqual([job[0] for (job,), _ in process.call_args_list], [self.path("blog/index.html")])
+        self.assertEqual(gzip.decompress(self.read("blog/index.html.gz")), b"<p>Edited</p>")
+
+    def test_removed_outputs_lose_their_siblings(self):
+        state = self.process()
+        os.remove(self.path("blog/index.html"))
+        state = self.process(state)
+        self.assertFalse(os.path.exists(self.path("blog")))
+        self.process(state, compress=False)
+        self.assertFalse(os.path.exists(self.path("index.html.gz")))
+
+    def test_parallel_matches_serial(self):
+        self.process(jobs=2)
+        self.assertEqual(gzip.decompress(self.read("blog/index.html.gz")), b"<p>Post</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
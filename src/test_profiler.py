@@ -0,0 +1,51 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from profiler import Profiler, timed, stage
+
+class TestProfiler(unittest.TestCase):
+    def test_timed(self):
+        timings = {}
+        with timed(timings, "parse"):
+            pass
+        with timed(timings, "parse"):
+            pass
+        self.assertEqual(list(timings), ["parse"])
+        self.assertGreaterEqual(timings["parse"], 0.0)
+
+    def test_timed_without_timings(self):
+        with timed(None, "parse"):
+            pass
+        with stage(None, "static"):
+            pass
+
+    def test_record_page(self):
+        profiler = Profiler()
+        profiler.record_page("a.md", {"read": 0.001, "write": 0.002, "size": 100})
+        profiler.record_page("b.md", {"read": 0.003, "write": 0.004, "size": 50})
+        self.assertEqual([page["path"] for page in profiler.slowest_pages(1)], ["b.md"])
+        self.assertAlmostEqual(profiler.page_stages["read"], 0.004)
+        self.assertEqual(profiler.pages[0]["size"], 100)
+        self.assertAlmostEqual(profiler.pages[0]["seconds"], 0.003)
+
+    def test_write_json(self):
+        profiler = Profiler()
+        with profiler.stage("static"):
+            pass
+        profiler.record_page("a.md", {"read": 0.001, "size": 10})
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "profile.json")
+            profiler.write_json(path)
+            with open(path) as f:
+                data = json.load(f)
+        finally:
+            shutil.rmtree(tmp)
+        self.assertEqual(set(data["stages"]), {"static"})
+        self.assertEqual(data["pages"][0]["path"], "a.md")
+
+if __name__ == "__main__":
+    unittest.main()
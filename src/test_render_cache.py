@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from htmlnode import markdown_to_html_node
+from markdown_utils import BlockType
+from render_cache import RenderCache
+
+MARKDOWN = """# Title
+
+Shared **footer** with a [link](/about)
+
+- one
+- two
+
+Shared **footer** with a [link](/about)
+"""
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_same_html_as_uncached(self):
+        cache = RenderCache()
+        resolve_url = lambda url: "/site" + url
+        self.assertEqual(
+            markdown_to_html_node(MARKDOWN, resolve_url, cache).to_html(),
+            markdown_to_html_node(MARKDOWN, resolve_url).to_html(),
+        )
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_hits_across_documents(self):
+        cache = RenderCache()
+        markdown_to_html_node(MARKDOWN, cache=cache)
+        markdown_to_html_node(MARKDOWN, cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (5, 3))
+        self.assertIn("5 hits, 3 misses (62% hit rate), 3 entries", cache.summary())
+
+    def test_hits_replay_urls(self):
+        cache = RenderCache()
+        for _ in range(2):
+            urls = []
+            markdown_to_html_node(MARKDOWN, lambda url: urls.append(url) or url, cache)
+            self.assertEqual(urls, ["/about", "/about"])
+        self.assertEqual((cache.hits, cache.misses), (5, 3))
+
+    def test_key_depends_on_type_and_salt(self):
+        cache = RenderCache(salt="/")
+        self.assertNotEqual(cache.key("text", BlockType.PARAGRAPH), cache.key("text", BlockType.QUOTE))
+        self.assertNotEqual(cache.key("text", BlockType.PARAGRAPH), RenderCache(salt="/site/").key("text", BlockType.PARAGRAPH))
+
+    def test_lru_eviction(self):
+        cache = RenderCache(maxsize=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        self.assertEqual(cache.get("a"), "A")
+        cache.put("c", "C")
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertIsNone(cache.get("b"))
+
+    def test_persisted_between_builds(self):
+        path = os.path.join(self.tmp, "cache", "render_cache.json")
+        cache = RenderCache(path=path, salt="/")
+        markdown_to_html_node(MARKDOWN, cache=cache)
+        cache.save()
+
+        cache = RenderCache(path=path, salt="/")
+        markdown_to_html_node(MARKDOWN, cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (4, 0))
+
+        # A different salt (e.g. another base path) must not reuse the entries
+        cache = RenderCache(path=path, salt="/site/")
+        self.assertEqual(len(cache.entries), 0)
+
+if __name__ == "__main__":
+    unittest.main()
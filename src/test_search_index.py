@@ -0,0 +1,90 @@
+import io
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from htmlnode import markdown_to_html_node
+from render_cache import RenderCache
+from search_index import SearchIndex, TermCounter, assign_ids, tokenize
+
+MARKDOWN = """# Rivendell Guide
+
+The **last homely house** east of the [Sea](/sea).
+
+```
+code_is_not_indexed
+```
+
+- house rules
+"""
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Élan, the Ring-bearer's a 2nd"), ["élan", "the", "ring", "bearer", "2nd"])
+
+    def test_term_counter_hook(self):
+        terms = TermCounter()
+        markdown_to_html_node(MARKDOWN, on_text=terms)
+        self.assertEqual(terms.terms["house"], 2)
+        self.assertEqual(terms.terms["sea"], 1)
+        self.assertEqual(terms.terms["rivendell"], 1)
+        self.assertNotIn("code_is_not_indexed", terms.terms)
+
+    def test_term_counter_with_render_cache(self):
+        cache = RenderCache()
+        for _ in range(2):
+            terms = TermCounter()
+            markdown_to_html_node(MARKDOWN, cache=cache, on_text=terms)
+            self.assertEqual(terms.terms["house"], 2)
+        self.assertEqual(cache.hits, 4)
+
+    def test_assign_ids(self):
+        self.assertEqual(assign_ids([], {"/b/", "/a/"}), ["/a/", "/b/"])
+        self.assertEqual(assign_ids(["/a/", "/b/", "/c/"], {"/c/", "/d/", "/e/"}), ["/d/", "/e/", "/c/"])
+        self.assertEqual(assign_ids(["/a/", "/b/"], {"/a/"}), ["/a/"])
+
+    def write(self, pages):
+        with redirect_stdout(io.StringIO()) as out:
+            SearchIndex(pages).write(self.tmp)
+        return out.getvalue()
+
+    def read(self, name):
+        with open(os.path.join(self.tmp, "search", name)) as f:
+            return json.load(f)
+
+    def test_write_shards(self):
+        self.write({
+            "a.md": {"url": "/a/", "title": "A", "terms": {"ring": 2, "sea": 1}},
+            "b.md": {"url": "/b/", "title": "B", "terms": {"ring": 1}},
+        })
+        table = self.read("index.json")
+        self.assertEqual(table["pages"], [["/a/", "A"], ["/b/", "B"]])
+        self.assertEqual(table["shards"], ["ri", "se"])
+        self.assertEqual(self.read("ri.json"), {"ring": [[0, 2], [1, 1]]})
+
+    def test_write_is_incremental(self):
+        pages = {
+            "a.md": {"url": "/a/", "title": "A", "terms": {"ring": 2, "sea": 1}},
+            "b.md": {"url": "/b/", "title": "B", "terms": {"ring": 1}},
+        }
+        self.write(pages)
+        # Removing a page keeps the other page's id, so only the shards it used change
+        del pages["a.md"]
+        pages["c.md"] = {"url": "/c/", "title": "C", "terms": {"tower": 1}}
+        self.assertIn("(3 files written)", self.write(pages))
+        self.assertEqual(self.read("index.json")["pages"], [["/c/", "C"], ["/b/", "B"]])
+        self.assertEqual(self.read("ri.json"), {"ring": [[1, 1]]})
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, "search", "se.json")))
+        self.assertIn("(0 files written)", self.write(pages))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import io
+import os
+import shutil
+import unittest
+from contextlib import redirect_stdout
+
+from test_generate_pages import GeneratePagesTestCase
+from generate_pages import find_pages
+from links import LinkIndex
+from shards import parse_shard, shard_of, select_shard, build_shard, load_shards, merge_shards
+
+class TestShards(GeneratePagesTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(12):
+            self.write(os.path.join(self.content_dir, "more", str(i), "index.md"), f"# Page {i}\n\n[Home](/) [next](/more/{i + 1})")
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for spec in ["0/4", "5/4", "4", "a/b"]:
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_shards_partition_pages(self):
+        pages = find_pages(self.content_dir, self.public_dir, self.template_path)
+        shards = [select_shard(pages, self.content_dir, shard, 3) for shard in range(1, 4)]
+        self.assertEqual(sorted(page.source for shard in shards for page in shard), sorted(page.source for page in pages))
+        # The assignment depends on the path under content_dir, not where content_dir is
+        moved = find_pages(self.content_dir + os.sep, self.public_dir, self.template_path)
+        self.assertEqual([shard_of(page, self.content_dir + os.sep, 3) for page in moved],
+                         [shard_of(page, self.content_dir, 3) for page in pages])
+
+    def build_shards(self, count):
+        shard_dirs = [os.path.join(self.tmp, "shards", str(shard)) for shard in range(1, count + 1)]
+        with redirect_stdout(io.StringIO()):
+            for shard, shard_dir in enumerate(shard_dirs, 1):
+                build_shard(shard, count, shard_dir, self.content_dir, self.template_path, "/site/")
+        return shard_dirs
+
+    def test_merge_matches_full_build(self):
+        pages = self.build_pages(base_path="/site/")
+        outputs = [os.path.relpath(page.output, self.public_dir) for page in find_pages(self.content_dir, self.public_dir, self.template_path)]
+        expected = [self.read(output) for output in outputs]
+        shutil.rmtree(self.public_dir)
+
+        shard_dirs = self.build_shards(3)
+        with redirect_stdout(io.StringIO()):
+            merged = merge_shards(load_shards(shard_dirs), self.public_dir)
+        self.assertEqual([self.read(output) for output in outputs], expected)
+        self.assertEqual(merged, pages)
+        self.assertEqual(LinkIndex(merged).broken(), [(os.path.join(self.content_dir, "more", "11", "index.md"), "/more/12")])
+
+    def test_load_shards_requires_every_shard_once(self):
+        shard_dirs = self.build_shards(3)
+        with self.assertRaises(ValueError):
+            load_shards(shard_dirs[:2])
+        with self.assertRaises(ValueError):
+            load_shards(shard_dirs + shard_dirs[:1])
+        self.assertEqual(len(load_shards(shard_dirs)), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 
 from textnode import TextNode, TextType
-from split_nodes import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+from split_nodes import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes, scan_textnodes
 
 class TestSplitNodesDelimiter(unittest.TestCase):
     def test_split_nodes_delimiter_basic(self):
@@ -202,6 +202,55 @@ class TestTextToTextNodes(unittest.TestCase):
         self.assertEqual(nodes[7].text_type, TextType.ITALIC)
         self.assertEqual(nodes[8].text, " text")
 
+    def test_text_to_textnodes_matches_split_chain(self):
+        samples = [
+            "Plain text only",
+            "**bold** then _italic_ then `code`",
+            "Links [one](https://one.com) and [two](https://two.com) with **bold**",
+            "An ![image](/images/a.png) next to a [link](/blog/a)",
+            "**multi\nline bold** and text",
+            "****",
+        ]
+        for text in samples:
+            nodes = [TextNode(text, TextType.TEXT)]
+            nodes = split_nodes_image(nodes)
+            nodes = split_nodes_link(nodes)
+            nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+            nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+            nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+            nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+            self.assertEqual(text_to_textnodes(text), nodes, text)
+
+    def test_text_to_textnodes_underscore_italic(self):
+        nodes = text_to_textnodes("Disney _didn't ruin it_ (okay)")
+        self.assertEqual(nodes, [
+            TextNode("Disney ", TextType.TEXT),
+            TextNode("didn't ruin it", TextType.ITALIC),
+            TextNode(" (okay)", TextType.TEXT),
+        ])
+
+    def test_text_to_textnodes_repeated_links(self):
+        text = "[same](https://a.com) and [same](https://b.com)"
+        self.assertEqual(text_to_textnodes(text), [
+            TextNode("same", TextType.LINK, "https://a.com"),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("same", TextType.LINK, "https://b.com"),
+        ])
+
+    def test_text_to_textnodes_code_keeps_delimiters(self):
+        nodes = text_to_textnodes("Use `a*b*c` here")
+        self.assertEqual(nodes[1], TextNode("a*b*c", TextType.CODE))
+
+    def test_text_to_textnodes_unclosed(self):
+        for text in ["This is *italic text", "This is **bold", "A `code span", "snake_case"]:
+            with self.assertRaises(ValueError):
+                text_to_textnodes(text)
+
+    def test_text_to_textnodes_plain_text(self):
+        text = "No markup here, just (parentheses) and ! marks"
+        self.assertEqual(text_to_textnodes(text), [TextNode(text, TextType.TEXT)])
+        self.assertEqual(text_to_textnodes(text), scan_textnodes(text))
+        self.assertEqual(text_to_textnodes(""), [])
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from static_files import scan_files, sync_static
+
+class TestSyncStatic(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.static = os.path.join(self.tmp, "static")
+        self.public = os.path.join(self.tmp, "public")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, *parts):
+        with open(os.path.join(self.public, *parts)) as f:
+            return f.read()
+
+    def test_scan_files(self):
+        self.assertEqual(sorted(scan_files(self.static)), ["images/a.png", "index.css"])
+        self.assertEqual(scan_files(os.path.join(self.tmp, "missing")), {})
+
+    def test_initial_sync_copies_everything(self):
+        files, stats = sync_static(self.static, self.public)
+        self.assertEqual(files, ["images/a.png", "index.css"])
+        self.assertEqual(stats["copied"] + stats["cloned"], 2)
+        self.assertEqual(self.read("images", "a.png"), "png")
+
+    def test_second_sync_copies_nothing(self):
+        files, _ = sync_static(self.static, self.public)
+        _, stats = sync_static(self.static, self.public, files)
+        self.assertEqual(stats["unchanged"], 2)
+        self.assertEqual(stats["copied"] + stats["cloned"] + stats["removed"], 0)
+
+    def test_changed_file_is_copied(self):
+        files, _ = sync_static(self.static, self.public)
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        _, stats = sync_static(self.static, self.public, files)
+        self.assertEqual(stats["unchanged"], 1)
+        self.assertEqual(self.read("index.css"), "body { color: red }")
+
+    def test_only_orphaned_static_files_are_removed(self):
+        files, _ = sync_static(self.static, self.public)
+        self.write(os.path.join(self.public, "blog", "index.html"), "generated page")
+        shutil.rmtree(os.path.join(self.static, "images"))
+
+        files, stats = sync_static(self.static, self.public, files)
+        self.assertEqual(files, ["index.css"])
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+        self.assertEqual(self.read("blog", "index.html"), "generated page")
+
+    def test_link(self):
+        _, stats = sync_static(self.static, self.public, link=True)
+        self.assertEqual(stats["linked"], 2)
+        self.assertTrue(os.path.samefile(os.path.join(self.static, "index.css"), os.path.join(self.public, "index.css")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import io
+import shutil
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import Template, load_template, find_template
+from urls import base_path_resolver
+
+class TestTemplate(unittest.TestCase):
+    def test_segments(self):
+        template = Template("<title>{{ Title }}</title><body>{{Content}}</body>")
+        self.assertEqual(template.slots, {"Title", "Content"})
+        self.assertEqual(template.repeated, set())
+        self.assertEqual(Template("{{ Title }} {{ Title }}").repeated, {"Title"})
+        self.assertEqual(
+            [(literal, name) for literal, name, _ in template.segments],
+            [("<title>", "Title"), ("</title><body>", "Content"), ("</body>", None)],
+        )
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}{{ Missing }}")
+        content = ParentNode("p", [LeafNode("b", "bold")])
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": content}),
+            "<h1>Hi</h1><p><b>bold</b></p>{{ Missing }}",
+        )
+
+    def test_write_matches_render(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}</html>")
+        values = {"Title": "Hi", "Content": ParentNode("p", [LeafNode(None, "text")])}
+        buffer = io.StringIO()
+        template.write(buffer, values)
+        self.assertEqual(buffer.getvalue(), template.render(values))
+
+    def test_repeated_placeholder(self):
+        template = Template("{{ Title }} - {{ Title }}")
+        self.assertEqual(template.render({"Title": "A"}), "A - A")
+
+    def test_resolve_url(self):
+        template = Template(
+            '<link href="/index.css"><img src="/a.png"><a href="https://x.com/">x</a>',
+            base_path_resolver("/site/"),
+        )
+        self.assertEqual(
+            template.render({}),
+            '<link href="/site/index.css"><img src="/site/a.png"><a href="https://x.com/">x</a>',
+        )
+
+class TestLoadTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_load_template_cached_until_modified(self):
+        path = os.path.join(self.tmp, "template.html")
+        self.write(path, "<p>{{ Title }}</p>")
+        first = load_template(path)
+        self.assertIs(load_template(path), first)
+
+        self.write(path, "<div>{{ Title }}</div>")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        second = load_template(path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.render({"Title": "x"}), "<div>x</div>")
+
+    def test_includes(self):
+        path = os.path.join(self.tmp, "template.html")
+        footer = os.path.join(self.tmp, "partials", "footer.html")
+        self.write(path, "<body>{{ Content }}{{> partials/footer.html }}</body>")
+        self.write(footer, '<footer><a href="/">{{ Title }}</a>{{> links.html }}</footer>')
+        self.write(os.path.join(self.tmp, "partials", "links.html"), "<nav></nav>")
+
+        template = load_template(path, base_path_resolver("/site/"))
+        self.assertEqual(
+            template.render({"Content": "x", "Title": "T"}),
+            '<body>x<footer><a href="/site/">T</a><nav></nav></footer></body>',
+        )
+        self.assertEqual(template.dependencies, [footer, os.path.join(self.tmp, "partials", "links.html")])
+
+    def test_include_change_invalidates_cache(self):
+        path = os.path.join(self.tmp, "template.html")
+        partial = os.path.join(self.tmp, "partial.html")
+        self.write(path, "{{> partial.html }}")
+        self.write(partial, "old")
+        self.assertEqual(load_template(path).render({}), "old")
+
+        self.write(partial, "newer")
+        self.assertEqual(load_template(path).render({}), "newer")
+
+    def test_include_cycle(self):
+        path = os.path.join(self.tmp, "template.html")
+        self.write(path, "{{> a.html }}")
+        self.write(os.path.join(self.tmp, "a.html"), "{{> template.html }}")
+        with self.assertRaises(ValueError):
+            load_template(path)
+
+    def test_find_template(self):
+        content = os.path.join(self.tmp, "content")
+        default = os.path.join(self.tmp, "template.html")
+        os.makedirs(os.path.join(content, "blog", "post"))
+        self.assertEqual(find_template(os.path.join(content, "blog", "post"), content, default), default)
+
+        blog_template = os.path.join(content, "blog", "template.html")
+        self.write(blog_template, "")
+        self.assertEqual(find_template(os.path.join(content, "blog", "post"), content, default), blog_template)
+        self.assertEqual(find_template(content, content, default), default)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from urls import is_site_url, base_path_resolver, site_resolver
+
+class TestUrls(unittest.TestCase):
+    def test_is_site_url(self):
+        self.assertTrue(is_site_url("/blog/tom"))
+        self.assertFalse(is_site_url("//cdn.example.com/a.css"))
+        self.assertFalse(is_site_url("https://example.com"))
+        self.assertFalse(is_site_url("#top"))
+
+    def test_base_path_resolver(self):
+        resolve_url = base_path_resolver("/site/")
+        self.assertEqual(resolve_url("/blog/tom"), "/site/blog/tom")
+        self.assertEqual(resolve_url("https://example.com"), "https://example.com")
+        self.assertIs(base_path_resolver("/site/"), resolve_url)
+
+    def test_site_resolver(self):
+        self.assertIs(site_resolver("/site/"), base_path_resolver("/site/"))
+        assets = {"/index.css": "/index.0123456789.css"}
+        resolve_url = site_resolver("/site/", assets)
+        self.assertEqual(resolve_url("/index.css"), "/site/index.0123456789.css")
+        self.assertEqual(resolve_url("/blog/tom"), "/site/blog/tom")
+        self.assertIs(site_resolver("/site/", assets), resolve_url)
+        self.assertIsNot(site_resolver("/site/", dict(assets)), resolve_url)
+
+if __name__ == "__main__":
+    unittest.main()
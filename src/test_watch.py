@@ -0,0 +1,133 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from contextlib import redirect_stdout
+
+import watch as watch_module
+from watch import Watcher
+from generate_pages import generate_pages_recursive
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.page = os.path.join(self.content, "blog", "index.md")
+        self.template = os.path.join(self.tmp, "template.html")
+        for path in (self.page, self.template):
+            with open(path, "w") as f:
+                f.write("x")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_no_changes(self):
+        watcher = Watcher([self.content, self.template])
+        self.assertEqual(watcher.changes(), set())
+
+    def test_detects_modified_added_and_removed(self):
+        watcher = Watcher([self.content, self.template, os.path.join(self.tmp, "missing")])
+        with open(self.template, "a") as f:
+            f.write("y")
+        added = os.path.join(self.content, "new.md")
+        with open(added, "w") as f:
+            f.write("new")
+        os.remove(self.page)
+
+        self.assertEqual(watcher.changes(), {self.template, added, self.page})
+        self.assertEqual(watcher.changes(), set())
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.content = os.path.join(self.tmp, "content")
+        self.static = os.path.join(self.tmp, "static")
+        self.public = os.path.join(self.tmp, "public")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.page = os.path.join(self.content, "index.md")
+        os.makedirs(self.static)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(self.page, "# Home\n\nHello")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read_output(self):
+        with open(os.path.join(self.public, "index.html")) as f:
+            return f.read()
+
+    # Runs watch, calling each of steps (and then stopping) where it would sleep
+    def run_watch(self, steps, **kwargs):
+        steps = iter(steps)
+
+        def sleep(interval):
+            step = next(steps, None)
+            if step is None:
+                raise KeyboardInterrupt
+            step()
+        out = io.StringIO()
+        with mock.patch.object(watch_module.time, "sleep", sleep), redirect_stdout(out):
+            watch_module.watch(lambda: [], self.content, self.static, self.template, self.public, **kwargs)
+        return out.getvalue()
+
+    def test_incremental_build_after_watch(self):
+        manifest_path = os.path.join(self.tmp, "manifest.json")
+        self.write(self.page, "# Home\n\n[About](/about)")
+
+        def incremental():
+            with redirect_stdout(io.StringIO()) as out:
+                generate_pages_recursive(self.content, self.template, self.public, "/site/", manifest_path)
+            return out.getvalue()
+        incremental()
+        # Watch serves the site from / and sees the page edited and then reverted
+        self.run_watch([
+            lambda: self.write(self.page, "# Home\n\n[Edited](/about)"),
+            lambda: self.write(self.page, "# Home\n\n[About](/about)"),
+        ], base_path="/", manifest_path=manifest_path)
+        self.assertIn('href="/about"', self.read_output())
+
+        self.assertIn("1 rendered, 0 unchanged", incremental())
+        self.assertIn('href="/site/about"', self.read_output())
+
+    def test_failed_rebuild_keeps_watching(self):
+        outputs = []
+        log = self.run_watch([
+            lambda: self.write(self.page, "# Home\n\nHalf **typed"),
+            lambda: outputs.append(self.read_output()),
+            lambda: self.write(self.page, "# Home\n\nFully **typed**"),
+        ])
+        self.assertIn("Rebuild failed: Invalid markdown - unclosed delimiter", log)
+        # The broken save left the last good page in place, and the next save rebuilt it
+        self.assertEqual(outputs, ["<title>Home</title><div><h1>Home</h1><p>Hello</p></div>"])
+        self.assertEqual(self.read_output(), "<title>Home</title><div><h1>Home</h1><p>Fully <b>typed</b></p></div>")
+        self.assertEqual(log.count("Rebuilt 1 changed file(s)"), 1)
+
+    def test_partial_change_rebuilds(self):
+        partial = os.path.join(self.tmp, "partials", "footer.html")
+        self.write(partial, "<footer>v1</footer>")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}{{> partials/footer.html }}")
+        self.run_watch([lambda: self.write(partial, "<footer>v2!</footer>")])
+        self.assertTrue(self.read_output().endswith("<footer>v2!</footer>"))
+
+    def test_set_paths(self):
+        partial = os.path.join(self.tmp, "partials", "footer.html")
+        self.write(partial, "<footer></footer>")
+        watcher = Watcher([self.content])
+        watcher.set_paths([self.content, partial])
+        self.assertEqual(watcher.changes(), set())
+        self.write(partial, "<footer>edited</footer>")
+        self.assertEqual(watcher.changes(), {partial})
+        watcher.set_paths([self.content])
+        self.assertEqual(watcher.changes(), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
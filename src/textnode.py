@@ -10,6 +10,9 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    # No per-instance __dict__: a page creates one of these for every inline span
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type: TextType, url=None):
         self.text = text
         self.text_type = text_type if isinstance(text_type, TextType) else TextType(text_type)
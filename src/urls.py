@@ -0,0 +1,36 @@
+import functools
+
+# True for root-relative URLs such as "/blog/tom", but not protocol-relative "//cdn.example.com"
+def is_site_url(url):
+    return url.startswith("/") and not url.startswith("//")
+
+# Returns a function that prefixes site URLs with base_path. The same base_path
+# always gets the same function, so it can be used as a cache key.
+@functools.lru_cache(maxsize=None)
+def base_path_resolver(base_path):
+    def resolve_url(url):
+        if is_site_url(url):
+            return base_path + url[1:]
+        return url
+    return resolve_url
+
+# Wraps resolve_url so asset URLs are first swapped for their fingerprinted names
+def asset_resolver(resolve_url, assets):
+    def resolve(url):
+        return resolve_url(assets.get(url, url))
+    return resolve
+
+# (base_path, id(assets)) -> (assets, resolver); assets is kept so its id stays unique
+_site_resolvers = {}
+
+# The resolve_url for a build: base_path_resolver, composed with asset_resolver when
+# there is an assets table. Like base_path_resolver it returns the same function
+# for the same arguments, so templates compiled with it stay cached.
+def site_resolver(base_path, assets=None):
+    if not assets:
+        return base_path_resolver(base_path)
+    cached = _site_resolvers.get((base_path, id(assets)))
+    if cached is None or cached[0] is not assets:
+        cached = (assets, asset_resolver(base_path_resolver(base_path), assets))
+        _site_resolvers[(base_path, id(assets))] = cached
+    return cached[1]
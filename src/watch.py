@@ -0,0 +1,145 @@
+import os
+import time
+import functools
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from generate_pages import find_pages, generate_pages_incremental, site_pages
+from links import LinkIndex
+from manifest import load_manifest, save_manifest
+
+# True when path is watched_path or a file under it
+def _under(path, watched_path):
+    path = os.path.normpath(path)
+    watched_path = os.path.normpath(watched_path)
+    return path == watched_path or path.startswith(os.path.join(watched_path, ""))
+
+# Polls a set of files and directories for changes using their mtime and size
+class Watcher:
+    def __init__(self, paths):
+        self.paths = paths
+        self.state = self.snapshot()
+
+    def snapshot(self):
+        state = {}
+        for path in self.paths:
+            if os.path.isdir(path):
+                self._scan(path, state)
+            elif os.path.exists(path):
+                stat = os.stat(path)
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def _scan(self, directory, state):
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    self._scan(entry.path, state)
+                else:
+                    stat = entry.stat()
+                    state[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+    # Watches paths from now on. Files of newly watched paths are not reported as
+    # added, and those of paths no longer watched are not reported as removed.
+    def set_paths(self, paths):
+        added = [path for path in paths if path not in self.paths]
+        removed = [path for path in self.paths if path not in paths]
+        self.paths = paths
+        self.state = {
+            path: signature for path, signature in self.state.items()
+            if not any(_under(path, removed_path) for removed_path in removed)
+        }
+        for path, signature in self.snapshot().items():
+            if path not in self.state and any(_under(path, added_path) for added_path in added):
+                self.state[path] = signature
+
+    # Returns the paths added, removed or modified since the last call
+    def changes(self):
+        state = self.snapshot()
+        changed = {path for path in state.keys() | self.state.keys() if state.get(path) != self.state.get(path)}
+        self.state = state
+        return changed
+
+# Serves public_dir over HTTP from a background thread
+def serve(public_dir, port):
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=public_dir)
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"Serving {public_dir} at http://localhost:{port}/")
+    return server
+
+# Files pages depend on outside watched_paths, such as the partials a template
+# includes with {{> ... }}, as recorded in the manifest
+def extra_dependencies(manifest, watched_paths):
+    return sorted({
+        path
+        for entry in manifest.get("pages", {}).values()
+        for path in entry["deps"]
+        if not any(_under(path, watched_path) for watched_path in watched_paths)
+    })
+
+# One build step of watch: copies static files if anything under static_dir changed
+# and renders the pages affected by anything else, then reports broken links.
+# changed=None builds everything. Returns the new (manifest, static_files).
+def rebuild(changed, manifest, static_files, copy_static, content_dir, static_dir, template_path, public_dir, base_path):
+    if changed is None or any(_under(path, static_dir) for path in changed):
+        static_files = copy_static()
+    if changed is None or any(not _under(path, static_dir) for path in changed):
+        # The manifest still holds every file hash, so only edited pages are re-read
+        pages = find_pages(content_dir, public_dir, template_path)
+        manifest = generate_pages_incremental(pages, manifest, public_dir, base_path)
+    LinkIndex(site_pages(manifest)).report(static_files or ())
+    return manifest, static_files
+
+# Keeps the build state in memory and rebuilds whatever changes under the
+# watched paths until interrupted. copy_static is called when static_dir changes and
+# returns the static files, which links are checked against after every rebuild.
+# A failed rebuild (say, a half-typed page) is reported and the previous state kept,
+# so the next save fixes it. With manifest_path, the state starts from and is saved
+# to the manifest --incremental builds use, so they know what watch wrote.
+def watch(copy_static, content_dir="./content", static_dir="./static", template_path="./template.html",
+          public_dir="./docs", base_path="/", port=None, interval=0.2, manifest_path=None):
+    settings = (copy_static, content_dir, static_dir, template_path, public_dir, base_path)
+    manifest = load_manifest(manifest_path) if manifest_path else {}
+    static_files = []
+
+    def build(changed):
+        nonlocal manifest, static_files
+        try:
+            manifest, static_files = rebuild(changed, manifest, static_files, *settings)
+            return True
+        except Exception as e:
+            print(f"{'Rebuild' if changed else 'Build'} failed: {e}")
+            # Pages rendered before the failure are newer than the manifest says, so
+            # forget the settings they were rendered with and the next build redoes them all
+            manifest = dict(manifest, base_path=None)
+            return False
+        finally:
+            if manifest_path:
+                save_manifest(manifest_path, manifest)
+
+    build(None)
+
+    server = serve(public_dir, port) if port else None
+    base_paths = [content_dir, static_dir, template_path]
+    watcher = Watcher(base_paths + extra_dependencies(manifest, base_paths))
+    print(f"Watching {content_dir}, {static_dir}, {template_path} and its includes for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(interval)
+            changed = watcher.changes()
+            if not changed:
+                continue
+
+            start = time.perf_counter()
+            if not build(changed):
+                continue
+            # Templates may have started or stopped including partials
+            watcher.set_paths(base_paths + extra_dependencies(manifest, base_paths))
+            print(f"Rebuilt {len(changed)} changed file(s) in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.shutdown()